@@ -1,13 +1,25 @@
-from flask import Flask, jsonify, request
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import json
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+import functools
+import gzip
 import logging
+import logging.handlers
 from pathlib import Path
 import threading
+import time
+import zlib
 import os
+import signal
+import sys
 from zoneinfo import ZoneInfo
 
 from config.settings import Config
@@ -15,19 +27,37 @@ from src.scraper_playwright import BoxMagicScraper
 
 os.makedirs("logs", exist_ok=True)
 # Setup logging
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_file_handler = logging.FileHandler('logs/api_server.log')
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+# Buffer file writes; flushed every 100 records, immediately on WARNING, and at the end of each scraper job
+# (see flush_log_file), so a killed process doesn't lose the lines explaining a failure
+_file_buffer = logging.handlers.MemoryHandler(capacity=100, flushLevel=logging.WARNING, target=_file_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('logs/api_server.log'),
+        _file_buffer,
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 logger.info(f"DEBUG: PLAYWRIGHT_BROWSERS_PATH = {os.environ.get('PLAYWRIGHT_BROWSERS_PATH')}")
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify, request.get_json, error handlers)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json_provider_class = OrjsonProvider
+app.json = OrjsonProvider(app)
 
 # Enable CORS for all origins (no restrictions)
 CORS(app)
@@ -45,10 +75,87 @@ SCRAPING_STATUS = {
     'error': None
 }
 
+# Minimum seconds between incremental progress saves during a scrape
+PROGRESS_SAVE_INTERVAL = 5.0
+_LAST_PROGRESS_SAVE = 0.0
+
+# Single background worker shared by every scraper type so at most one
+# Playwright instance runs at a time
+SCRAPER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper')
+SCRAPER_SEM = threading.BoundedSemaphore(1)
+_PENDING_SCRAPES = {}
+_PENDING_LOCK = threading.Lock()
+
+# Background scheduler, started once by create_app()
+SCHEDULER = None
+_APP_INIT_LOCK = threading.Lock()
+
+# Browser kept warm across scheduled runs; only touched from the scraper worker
+_SCRAPER_SINGLETON = None
+_SCRAPER_LOCK = threading.Lock()
+
+# Serialized JSON responses, rebuilt only when the underlying data changes
+_DATA_VERSION = 0
+_ETAG_PREFIX = format(int(time.time()), 'x')
+_CHECKIN_JSON_CACHE = None
+_CALENDAR_JSON_CACHE = None
+
+# Lookup indexes over the check-in data, rebuilt together with the caches above
+_CHECKIN_DATE_INDEX = {}
+_CHECKIN_CLASS_INDEX = {}
+_AVAILABLE_DATES_LIST = []
+_AVAILABLE_CLASSES_BY_DATE = {}
+# Serialized 404 bodies; the class lists are serialized lazily on the first miss per date
+_AVAILABLE_DATES_JSON = None
+_AVAILABLE_CLASSES_JSON = {}
+_NO_DATA_JSON = orjson.dumps({'error': 'No data available'})
+_DATE_NOT_FOUND_JSON = orjson.dumps({'error': 'Date not found'})
+
+# Counters served by /api/all-data, refreshed whenever the data changes
+_SUMMARY = {
+    'checkin_available': False,
+    'calendar_available': False,
+    'total_dates': 0,
+    'total_classes': 0,
+    'total_reservations': 0,
+    'total_calendar_events': 0
+}
+
 # File paths
 DATA_DIR = Path(__file__).parent / 'data' / 'output'
-LATEST_CHECKIN_FILE = DATA_DIR / 'latest_checkin.json'
-LATEST_CALENDAR_FILE = DATA_DIR / 'latest_calendar.json'
+LATEST_CHECKIN_FILE = DATA_DIR / 'latest_checkin.json.gz'
+LATEST_CALENDAR_FILE = DATA_DIR / 'latest_calendar.json.gz'
+# Uncompressed files written by older versions, read if no .gz file exists yet
+LEGACY_CHECKIN_FILE = DATA_DIR / 'latest_checkin.json'
+LEGACY_CALENDAR_FILE = DATA_DIR / 'latest_calendar.json'
+# Number of timestamped backups kept per scraper type
+BACKUP_RETENTION = 48
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+# Runtime-invariant settings, resolved once at import
+_TZ = ZoneInfo(Config.TIMEZONE)
+CHECKIN_DAYS_COUNT = 7
+
+
+# (epoch second, ISO timestamp) for now_iso()
+_NOW_ISO_CACHE = (0, '')
+
+
+def now_iso():
+    """Current local time as an ISO string, formatted at most once per wall-clock second"""
+    t = int(time.time())
+    cached = _NOW_ISO_CACHE
+    if cached[0] == t:
+        return cached[1]
+    return _update_now_iso(t)
+
+
+def _update_now_iso(t):
+    global _NOW_ISO_CACHE
+    
+    iso = datetime.fromtimestamp(t).isoformat()
+    _NOW_ISO_CACHE = (t, iso)
+    return iso
 
 
 def load_latest_data():
@@ -56,191 +163,401 @@ def load_latest_data():
     global LATEST_CHECKIN_DATA, LATEST_CALENDAR_DATA
     
     try:
-        if LATEST_CHECKIN_FILE.exists():
-            with open(LATEST_CHECKIN_FILE, 'r', encoding='utf-8') as f:
-                LATEST_CHECKIN_DATA = json.load(f)
-            logger.info(f"Loaded latest check-in data from {LATEST_CHECKIN_FILE}")
+        checkin_file = LATEST_CHECKIN_FILE if LATEST_CHECKIN_FILE.exists() else LEGACY_CHECKIN_FILE
+        if checkin_file.exists():
+            LATEST_CHECKIN_DATA = read_data_file(checkin_file)
+            logger.info(f"Loaded latest check-in data from {checkin_file}")
         
-        if LATEST_CALENDAR_FILE.exists():
-            with open(LATEST_CALENDAR_FILE, 'r', encoding='utf-8') as f:
-                LATEST_CALENDAR_DATA = json.load(f)
-            logger.info(f"Loaded latest calendar data from {LATEST_CALENDAR_FILE}")
+        calendar_file = LATEST_CALENDAR_FILE if LATEST_CALENDAR_FILE.exists() else LEGACY_CALENDAR_FILE
+        if calendar_file.exists():
+            LATEST_CALENDAR_DATA = read_data_file(calendar_file)
+            logger.info(f"Loaded latest calendar data from {calendar_file}")
     except Exception as e:
         logger.error(f"Error loading data: {e}")
+    
+    _rebuild_caches()
+
+
+def current_status():
+    """Scraping status with next_scheduled read live from the scheduler"""
+    job = SCHEDULER.get_job('checkin_scraper') if SCHEDULER is not None else None
+    next_run = job.next_run_time.isoformat() if job and job.next_run_time else None
+    return {**SCRAPING_STATUS, 'next_scheduled': next_run}
+
+
+def _update_summary():
+    """Recompute the /api/all-data counters in a single pass over the latest data"""
+    checkin_summary = (LATEST_CHECKIN_DATA.get('summary') or {}) if LATEST_CHECKIN_DATA else {}
+    
+    _SUMMARY['checkin_available'] = bool(LATEST_CHECKIN_DATA)
+    _SUMMARY['calendar_available'] = bool(LATEST_CALENDAR_DATA)
+    _SUMMARY['total_dates'] = len(LATEST_CHECKIN_DATA.get('dates', {})) if LATEST_CHECKIN_DATA else 0
+    _SUMMARY['total_classes'] = checkin_summary.get('totalClasses', 0)
+    _SUMMARY['total_reservations'] = checkin_summary.get('totalReservations', 0)
+    _SUMMARY['total_calendar_events'] = len(LATEST_CALENDAR_DATA.get('events', [])) if LATEST_CALENDAR_DATA else 0
+
+
+def _rebuild_caches():
+    """Re-serialize cached responses after the data or scraping status changes"""
+    global _DATA_VERSION, _CHECKIN_JSON_CACHE, _CALENDAR_JSON_CACHE
+    
+    _update_summary()
+    _rebuild_checkin_indexes()
+    _CHECKIN_JSON_CACHE = orjson.dumps(LATEST_CHECKIN_DATA) if LATEST_CHECKIN_DATA else None
+    _CALENDAR_JSON_CACHE = orjson.dumps(LATEST_CALENDAR_DATA) if LATEST_CALENDAR_DATA else None
+    _DATA_VERSION += 1
+
+
+def _rebuild_checkin_indexes():
+    """Index check-in data by date and by (date, class) so lookups are a single dict hit"""
+    global _CHECKIN_DATE_INDEX, _CHECKIN_CLASS_INDEX, _AVAILABLE_DATES_LIST, _AVAILABLE_CLASSES_BY_DATE
+    global _AVAILABLE_DATES_JSON, _AVAILABLE_CLASSES_JSON
+    
+    dates = (LATEST_CHECKIN_DATA.get('dates') or {}) if LATEST_CHECKIN_DATA else {}
+    class_index = {}
+    available_classes = {}
+    for date, day in dates.items():
+        classes = day.get('classes') or {}
+        for class_id, class_data in classes.items():
+            class_index[(date, class_id)] = class_data
+        # Name lookups are the fallback: never shadow a class_id, first match wins
+        for class_data in classes.values():
+            class_index.setdefault((date, class_data.get('class')), class_data)
+        available_classes[date] = list(classes.keys())
+    
+    available_dates = list(dates.keys())
+    # The date list rarely changes between scrapes; only re-serialize when it does
+    if available_dates != _AVAILABLE_DATES_LIST or _AVAILABLE_DATES_JSON is None:
+        _AVAILABLE_DATES_JSON = orjson.dumps({
+            'error': 'Date not found',
+            'available_dates': available_dates
+        })
+    if available_classes != _AVAILABLE_CLASSES_BY_DATE:
+        _AVAILABLE_CLASSES_JSON = {}
+    
+    _CHECKIN_DATE_INDEX = dates
+    _CHECKIN_CLASS_INDEX = class_index
+    _AVAILABLE_DATES_LIST = available_dates
+    _AVAILABLE_CLASSES_BY_DATE = available_classes
+
+
+def _class_not_found_json(date):
+    """Serialized 404 body listing the classes available on date"""
+    body = _AVAILABLE_CLASSES_JSON.get(date)
+    if body is None:
+        body = orjson.dumps({
+            'error': 'Class not found',
+            'available_classes': _AVAILABLE_CLASSES_BY_DATE.get(date, []),
+            'hint': 'Use class_id (e.g. 105112-237420) or exact class name'
+        })
+        _AVAILABLE_CLASSES_JSON[date] = body
+    return body
+
+
+def read_data_file(file_path):
+    """Read a JSON data file, transparently decompressing gzip content"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if raw[:2] == b'\x1f\x8b':
+        raw = gzip.decompress(raw)
+    return orjson.loads(raw)
 
 
 def save_data_to_file(data, file_path):
-    """Save data to file"""
+    """
+    Save data to file atomically (write to a temp file, then rename over the target).
+    Paths ending in .gz are written as compact gzip-compressed JSON.
+    """
     try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Data saved to {file_path}")
+        tmp_path = file_path.with_suffix(file_path.suffix + '.tmp')
+        if file_path.suffix == '.gz':
+            # Level 1 is close to memcpy speed and still shrinks JSON several times
+            with gzip.open(tmp_path, 'wb', compresslevel=1) as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, file_path)
+        logger.debug(f"Data saved to {file_path}")
         return True
     except Exception as e:
         logger.error(f"Error saving data to {file_path}: {e}")
         return False
 
 
-def run_checkin_scraper():
-    """Run check-in scraper"""
-    global LATEST_CHECKIN_DATA, SCRAPING_STATUS
-    
-    if SCRAPING_STATUS['is_scraping']:
-        logger.warning("Scraping already in progress, skipping...")
-        return
-    
+def prune_backups(prefix):
+    """Delete all but the newest BACKUP_RETENTION timestamped backups for prefix"""
+    backups = sorted(
+        p for p in DATA_DIR.glob(f'{prefix}_*.json*') if p.suffix != '.tmp'
+    )
+    for old_backup in backups[:-BACKUP_RETENTION]:
+        try:
+            old_backup.unlink()
+        except OSError as e:
+            logger.warning(f"Could not delete old backup {old_backup}: {e}")
+
+
+def flush_log_file():
+    """Write buffered log records to logs/api_server.log (called at scraper job boundaries)"""
     try:
-        SCRAPING_STATUS['is_scraping'] = True
-        SCRAPING_STATUS['last_scrape'] = datetime.now().isoformat()
-        SCRAPING_STATUS['error'] = None
-        
-        logger.info("="*80)
-        logger.info("Starting scheduled check-in scraping...")
-        logger.info("="*80)
-        
-        Config.validate()
-        
-        # Force headless mode for API server to avoid terminal issues
-        original_headless = Config.HEADLESS
-        Config.HEADLESS = True
-        
-        scraper = BoxMagicScraper(Config)
-        # Auto-login if session is invalid or doesn't exist
-        scraper.start_browser(use_saved_session=True, auto_login=True)
-        
-        # Restore original headless setting
-        Config.HEADLESS = original_headless
-        
-        # Calculate date range (today + next 7 days)
-        tz = ZoneInfo(Config.TIMEZONE)
-        today = datetime.now(tz)
-        days_count = 7
+        _file_buffer.flush()
+    except Exception:
+        pass
+
+
+def submit_scrape(func):
+    """Queue a scraper run on the shared worker, coalescing with a pending run of the same scraper"""
+    with _PENDING_LOCK:
+        future = _PENDING_SCRAPES.get(func.__name__)
+        if future is not None and not future.done():
+            logger.warning(f"{func.__name__} already queued or running, skipping...")
+            return future
         
-        logger.info(f"Scraping {days_count} days starting from {today.strftime('%d-%m-%Y')}")
+        future = SCRAPER_POOL.submit(func)
+        _PENDING_SCRAPES[func.__name__] = future
+        return future
+
+
+def get_scraper():
+    """Return the shared scraper, starting a new browser if none is alive"""
+    global _SCRAPER_SINGLETON
+    
+    with _SCRAPER_LOCK:
+        if _SCRAPER_SINGLETON is None or not _SCRAPER_SINGLETON.is_alive():
+            if _SCRAPER_SINGLETON is not None:
+                logger.warning("Scraper browser is no longer alive, restarting...")
+                try:
+                    _SCRAPER_SINGLETON.close()
+                except Exception as e:
+                    logger.debug(f"Error closing dead scraper: {e}")
+            
+            # Always headless in the API server to avoid terminal issues
+            scraper = BoxMagicScraper(Config, headless=True)
+            # Auto-login if session is invalid or doesn't exist
+            scraper.start_browser(use_saved_session=True, auto_login=True)
+            
+            _SCRAPER_SINGLETON = scraper
         
-        # Define callback for incremental saving
-        def on_progress(data):
-            global LATEST_CHECKIN_DATA
+        return _SCRAPER_SINGLETON
+
+
+def close_scraper():
+    """Close the shared scraper browser (next get_scraper() starts a fresh one)"""
+    global _SCRAPER_SINGLETON
+    
+    with _SCRAPER_LOCK:
+        if _SCRAPER_SINGLETON is not None:
             try:
-                # Update global data
-                LATEST_CHECKIN_DATA = data
-                # Save to file
-                save_data_to_file(data, LATEST_CHECKIN_FILE)
-                logger.info(f"✓ Progress saved: {len(data.get('dates', {}))} dates scraped")
+                _SCRAPER_SINGLETON.close()
             except Exception as e:
-                logger.error(f"Error saving progress: {e}")
-
-        # Scrape check-in data
-        checkin_data = scraper.scrape_checkin_all_dates(
-            start_date=today,
-            days_count=days_count,
-            on_progress=on_progress,
-            existing_data=LATEST_CHECKIN_DATA
-        )
-        
-        scraper.close()
+                logger.error(f"Error closing scraper: {e}")
+            _SCRAPER_SINGLETON = None
+
+
+def recycle_scraper():
+    """Close the warm browser so the next run starts fresh and memory is reclaimed"""
+    logger.info("Recycling scraper browser...")
+    close_scraper()
+
+
+def shutdown_scraper(timeout=30):
+    """Close the shared browser on the scraper worker thread, which owns the Playwright objects"""
+    try:
+        SCRAPER_POOL.submit(close_scraper).result(timeout=timeout)
+    except Exception as e:
+        logger.error(f"Error shutting down scraper: {e}")
+    SCRAPER_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+def run_checkin_scraper():
+    """Run check-in scraper"""
+    global LATEST_CHECKIN_DATA, SCRAPING_STATUS
+    
+    with SCRAPER_SEM:
+        if SCRAPING_STATUS['is_scraping']:
+            logger.warning("Scraping already in progress, skipping...")
+            return
         
-        if checkin_data and checkin_data.get('dates'):
-            # Save to latest file
-            save_data_to_file(checkin_data, LATEST_CHECKIN_FILE)
+        try:
+            SCRAPING_STATUS['is_scraping'] = True
+            SCRAPING_STATUS['last_scrape'] = now_iso()
+            SCRAPING_STATUS['error'] = None
+            _rebuild_caches()
             
-            # Also save timestamped backup
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = DATA_DIR / f'checkin_data_{timestamp}.json'
-            save_data_to_file(checkin_data, backup_file)
+            logger.info("="*80)
+            logger.info("Starting scheduled check-in scraping...")
+            logger.info("="*80)
             
-            # Update global data
-            LATEST_CHECKIN_DATA = checkin_data
+            scraper = get_scraper()
             
-            SCRAPING_STATUS['last_success'] = datetime.now().isoformat()
-            logger.info("✓ Check-in scraping completed successfully!")
-        else:
-            raise Exception("No data scraped")
-        
-    except Exception as e:
-        logger.error(f"Error during scheduled scraping: {e}", exc_info=True)
-        SCRAPING_STATUS['error'] = str(e)
-    finally:
-        SCRAPING_STATUS['is_scraping'] = False
+            # Calculate date range (today + next 7 days)
+            today = datetime.now(_TZ)
+            days_count = CHECKIN_DAYS_COUNT
+            
+            logger.info(f"Scraping {days_count} days starting from {today.strftime('%d-%m-%Y')}")
+            
+            # Define callback for incremental saving
+            def on_progress(data):
+                global LATEST_CHECKIN_DATA, _LAST_PROGRESS_SAVE
+                try:
+                    # Update global data
+                    LATEST_CHECKIN_DATA = data
+                    
+                    # Re-serialize and save at most once per interval; the final save happens after the scrape
+                    now = time.monotonic()
+                    if now - _LAST_PROGRESS_SAVE < PROGRESS_SAVE_INTERVAL:
+                        return
+                    _LAST_PROGRESS_SAVE = now
+                    
+                    _rebuild_caches()
+                    # Save to file
+                    save_data_to_file(data, LATEST_CHECKIN_FILE)
+                    logger.debug(f"✓ Progress saved: {len(data.get('dates', {}))} dates scraped")
+                except Exception as e:
+                    logger.error(f"Error saving progress: {e}")
+
+            # Scrape check-in data
+            checkin_data = scraper.scrape_checkin_all_dates(
+                start_date=today,
+                days_count=days_count,
+                on_progress=on_progress,
+                existing_data=LATEST_CHECKIN_DATA
+            )
+            
+            if checkin_data and checkin_data.get('dates'):
+                # Save to latest file
+                save_data_to_file(checkin_data, LATEST_CHECKIN_FILE)
+                
+                # Also save timestamped backup
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                backup_file = DATA_DIR / f'checkin_data_{timestamp}.json.gz'
+                save_data_to_file(checkin_data, backup_file)
+                prune_backups('checkin_data')
+                
+                # Update global data
+                LATEST_CHECKIN_DATA = checkin_data
+                
+                SCRAPING_STATUS['last_success'] = now_iso()
+                logger.info("✓ Check-in scraping completed successfully!")
+            else:
+                raise Exception("No data scraped")
+            
+        except Exception as e:
+            logger.error(f"Error during scheduled scraping: {e}", exc_info=True)
+            SCRAPING_STATUS['error'] = str(e)
+            # Don't reuse a browser left in an unknown state
+            close_scraper()
+        finally:
+            SCRAPING_STATUS['is_scraping'] = False
+            _rebuild_caches()
+            flush_log_file()
 
 
 def run_calendar_scraper():
     """Run calendar scraper"""
     global LATEST_CALENDAR_DATA, SCRAPING_STATUS
     
-    try:
-        logger.info("Starting scheduled calendar scraping...")
-        
-        Config.validate()
-        
-        # Force headless mode for API server to avoid terminal issues
-        original_headless = Config.HEADLESS
-        Config.HEADLESS = True
-        
-        scraper = BoxMagicScraper(Config)
-        # Auto-login if session is invalid or doesn't exist
-        scraper.start_browser(use_saved_session=True, auto_login=True)
-        
-        # Restore original headless setting
-        Config.HEADLESS = original_headless
-        
-        # Navigate and scrape calendar
-        calendar_data = scraper.scrape_calendar_with_details()
-        
-        scraper.close()
-        
-        if calendar_data and calendar_data.get('events'):
-            save_data_to_file(calendar_data, LATEST_CALENDAR_FILE)
+    with SCRAPER_SEM:
+        try:
+            logger.info("Starting scheduled calendar scraping...")
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = DATA_DIR / f'calendar_data_{timestamp}.json'
-            save_data_to_file(calendar_data, backup_file)
+            scraper = get_scraper()
             
-            LATEST_CALENDAR_DATA = calendar_data
-            logger.info("✓ Calendar scraping completed successfully!")
-        
-    except Exception as e:
-        logger.error(f"Error during calendar scraping: {e}", exc_info=True)
+            # Navigate and scrape calendar
+            calendar_data = scraper.scrape_calendar_with_details()
+            
+            if calendar_data and calendar_data.get('events'):
+                save_data_to_file(calendar_data, LATEST_CALENDAR_FILE)
+                
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                backup_file = DATA_DIR / f'calendar_data_{timestamp}.json.gz'
+                save_data_to_file(calendar_data, backup_file)
+                prune_backups('calendar_data')
+                
+                LATEST_CALENDAR_DATA = calendar_data
+                _rebuild_caches()
+                logger.info("✓ Calendar scraping completed successfully!")
+            
+        except Exception as e:
+            logger.error(f"Error during calendar scraping: {e}", exc_info=True)
+            close_scraper()
+        finally:
+            flush_log_file()
 
 
 # ========================================
 # API ENDPOINTS
 # ========================================
 
+# Data is refreshed every 15 minutes, so clients and CDNs may reuse read responses briefly
+READ_CACHE_MAX_AGE = 15
+
+
+def json_bytes_response(body, status=200, max_age=None):
+    """Wrap already-serialized JSON bytes in a response without re-encoding them"""
+    response = app.response_class(body, status=status, mimetype='application/json', direct_passthrough=True)
+    response.headers['Content-Length'] = str(len(body))
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+def ojsonify(obj, max_age=None):
+    """jsonify replacement backed by orjson"""
+    return json_bytes_response(orjson.dumps(obj), max_age=max_age)
+
+
+def cached_json_response(body):
+    """Serve pre-serialized JSON with an ETag so repeated polls can get a 304"""
+    response = json_bytes_response(body, max_age=READ_CACHE_MAX_AGE)
+    response.set_etag(f'{_ETAG_PREFIX}-{_DATA_VERSION}')
+    return response.make_conditional(request)
+
+
+# Static home payload, serialized once at import
+_HOME_BYTES = orjson.dumps({
+    'status': 'online',
+    'message': 'BoxMagic API Server',
+    'version': '1.0',
+    'endpoints': {
+        'GET /api/checkin': 'Get latest check-in data',
+        'GET /api/checkin/<date>': 'Get check-in data for specific date (DD-MM-YYYY)',
+        'GET /api/calendar': 'Get latest calendar/schedule data',
+        'GET /api/all-data': 'Get all scraped data (check-in + calendar)',
+        'GET /api/status': 'Get scraping status',
+        'POST /api/scrape/now': 'Trigger immediate scraping',
+        'GET /health': 'Health check'
+    }
+})
+
+
+@functools.lru_cache(maxsize=1)
+def _health_bytes(second):
+    """Serialized health payload, rebuilt at most once per wall-clock second"""
+    return orjson.dumps({
+        'status': 'healthy',
+        'timestamp': now_iso()
+    })
+
+
 @app.route('/')
 def home():
     """API home"""
-    return jsonify({
-        'status': 'online',
-        'message': 'BoxMagic API Server',
-        'version': '1.0',
-        'endpoints': {
-            'GET /api/checkin': 'Get latest check-in data',
-            'GET /api/checkin/<date>': 'Get check-in data for specific date (DD-MM-YYYY)',
-            'GET /api/calendar': 'Get latest calendar/schedule data',
-            'GET /api/all-data': 'Get all scraped data (check-in + calendar)',
-            'GET /api/status': 'Get scraping status',
-            'POST /api/scrape/now': 'Trigger immediate scraping',
-            'GET /health': 'Health check'
-        }
-    })
+    return json_bytes_response(_HOME_BYTES)
 
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
-    })
+    return json_bytes_response(_health_bytes(int(time.time())))
 
 
 @app.route('/api/status')
 def status():
     """Get scraping status"""
-    return jsonify({
-        'status': SCRAPING_STATUS,
+    return ojsonify({
+        'status': current_status(),
         'data_available': {
             'checkin': bool(LATEST_CHECKIN_DATA),
             'calendar': bool(LATEST_CALENDAR_DATA)
@@ -252,138 +569,126 @@ def status():
 def get_checkin_data():
     """Get all check-in data"""
     if not LATEST_CHECKIN_DATA:
-        return jsonify({
+        return ojsonify({
             'error': 'No data available',
             'message': 'Check-in data has not been scraped yet'
         }), 404
     
-    return jsonify(LATEST_CHECKIN_DATA)
+    return cached_json_response(_CHECKIN_JSON_CACHE)
 
 
 @app.route('/api/checkin/<date>')
 def get_checkin_by_date(date):
     """Get check-in data for specific date"""
     if not LATEST_CHECKIN_DATA:
-        return jsonify({'error': 'No data available'}), 404
+        return json_bytes_response(_NO_DATA_JSON, status=404)
     
-    dates = LATEST_CHECKIN_DATA.get('dates', {})
+    day = _CHECKIN_DATE_INDEX.get(date)
+    if day is None:
+        return json_bytes_response(_AVAILABLE_DATES_JSON, status=404)
     
-    if date not in dates:
-        return jsonify({
-            'error': 'Date not found',
-            'available_dates': list(dates.keys())
-        }), 404
-    
-    return jsonify({
+    return ojsonify({
         'date': date,
-        'data': dates[date]
-    })
+        'data': day
+    }, max_age=READ_CACHE_MAX_AGE)
 
 
 @app.route('/api/checkin/class/<date>/<class_key>')
 def get_checkin_by_class(date, class_key):
     """Get reservations for specific class on specific date. class_key can be class_id (e.g. 105112-237420) or class name."""
     if not LATEST_CHECKIN_DATA:
-        return jsonify({'error': 'No data available'}), 404
-    
-    dates = LATEST_CHECKIN_DATA.get('dates', {})
+        return json_bytes_response(_NO_DATA_JSON, status=404)
     
-    if date not in dates:
-        return jsonify({'error': 'Date not found'}), 404
+    if date not in _CHECKIN_DATE_INDEX:
+        return json_bytes_response(_DATE_NOT_FOUND_JSON, status=404)
     
-    classes = dates[date].get('classes', {})
-    
-    # Direct lookup by class_id (storage key)
-    if class_key in classes:
-        class_data = classes[class_key]
-    else:
-        # Fallback: lookup by class name
-        class_data = next((c for c in classes.values() if c.get('class') == class_key), None)
+    # Keyed by both class_id (storage key) and class name
+    class_data = _CHECKIN_CLASS_INDEX.get((date, class_key))
     
     if not class_data:
-        available = list(classes.keys())
-        return jsonify({
-            'error': 'Class not found',
-            'available_classes': available,
-            'hint': 'Use class_id (e.g. 105112-237420) or exact class name'
-        }), 404
+        return json_bytes_response(_class_not_found_json(date), status=404)
     
-    return jsonify({
+    return ojsonify({
         'date': date,
         'class': class_data.get('class'),
         'classId': class_data.get('classId'),
         'data': class_data
-    })
+    }, max_age=READ_CACHE_MAX_AGE)
 
 
 @app.route('/api/calendar')
 def get_calendar_data():
     """Get calendar/schedule data"""
     if not LATEST_CALENDAR_DATA:
-        return jsonify({
+        return ojsonify({
             'error': 'No data available',
             'message': 'Calendar data has not been scraped yet'
         }), 404
     
-    return jsonify(LATEST_CALENDAR_DATA)
+    return cached_json_response(_CALENDAR_JSON_CACHE)
 
 
 @app.route('/api/scrape/now', methods=['POST'])
 def trigger_scrape():
     """Trigger immediate scraping"""
     if SCRAPING_STATUS['is_scraping']:
-        return jsonify({
+        return ojsonify({
             'error': 'Scraping already in progress',
-            'status': SCRAPING_STATUS
+            'status': current_status()
         }), 409
     
     # Get scrape type from request
     data = request.get_json() or {}
     scrape_type = data.get('type', 'checkin')  # 'checkin' or 'calendar'
     
-    # Run scraper in background thread
+    # Run scraper on the background worker
     if scrape_type == 'checkin':
-        thread = threading.Thread(target=run_checkin_scraper)
+        submit_scrape(run_checkin_scraper)
     elif scrape_type == 'calendar':
-        thread = threading.Thread(target=run_calendar_scraper)
+        submit_scrape(run_calendar_scraper)
     else:
-        return jsonify({'error': 'Invalid scrape type'}), 400
-    
-    thread.start()
+        return ojsonify({'error': 'Invalid scrape type'}), 400
     
-    return jsonify({
+    return ojsonify({
         'message': f'{scrape_type.capitalize()} scraping started',
-        'status': SCRAPING_STATUS
+        'status': current_status()
     })
 
 
+def _all_data_chunks(status_json):
+    """
+    The /api/all-data document as a sequence of byte chunks, splicing in the cached
+    check-in and calendar JSON so the full document is never serialized or buffered at once.
+    """
+    return (
+        b'{"scrapedAt":', orjson.dumps(now_iso()),
+        b',"status":', status_json,
+        b',"data":{"checkin":', _CHECKIN_JSON_CACHE or b'null',
+        b',"calendar":', _CALENDAR_JSON_CACHE or b'null',
+        b'},"summary":', orjson.dumps(_SUMMARY),
+        b'}'
+    )
+
+
 @app.route('/api/all-data')
 def get_all_data():
     """Get all scraped data (both check-in and calendar)"""
     if not LATEST_CHECKIN_DATA and not LATEST_CALENDAR_DATA:
-        return jsonify({
+        return ojsonify({
             'error': 'No data available',
             'message': 'No data has been scraped yet'
         }), 404
     
-    response = {
-        'scrapedAt': datetime.now().isoformat(),
-        'status': SCRAPING_STATUS,
-        'data': {
-            'checkin': LATEST_CHECKIN_DATA if LATEST_CHECKIN_DATA else None,
-            'calendar': LATEST_CALENDAR_DATA if LATEST_CALENDAR_DATA else None
-        },
-        'summary': {
-            'checkin_available': bool(LATEST_CHECKIN_DATA),
-            'calendar_available': bool(LATEST_CALENDAR_DATA),
-            'total_dates': len(LATEST_CHECKIN_DATA.get('dates', {})) if LATEST_CHECKIN_DATA else 0,
-            'total_classes': LATEST_CHECKIN_DATA.get('summary', {}).get('totalClasses', 0) if LATEST_CHECKIN_DATA else 0,
-            'total_reservations': LATEST_CHECKIN_DATA.get('summary', {}).get('totalReservations', 0) if LATEST_CHECKIN_DATA else 0,
-            'total_calendar_events': len(LATEST_CALENDAR_DATA.get('events', [])) if LATEST_CALENDAR_DATA else 0
-        }
-    }
-    
-    return jsonify(response)
+    # The live status (next_scheduled moves with the scheduler, not with _DATA_VERSION) is part of the ETag,
+    # and clients must revalidate every time instead of reusing a possibly stale status for max-age
+    status_json = orjson.dumps(current_status())
+    chunks = _all_data_chunks(status_json)
+    response = app.response_class(iter(chunks), mimetype='application/json', direct_passthrough=True)
+    response.headers['Content-Length'] = str(sum(len(chunk) for chunk in chunks))
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.set_etag(f'{_ETAG_PREFIX}-{_DATA_VERSION}-{zlib.crc32(status_json):08x}')
+    return response.make_conditional(request)
 
 
 # ========================================
@@ -396,7 +701,8 @@ def setup_scheduler():
     
     # Schedule check-in scraping every 15 minutes
     scheduler.add_job(
-        func=run_checkin_scraper,
+        func=submit_scrape,
+        args=[run_checkin_scraper],
         trigger=CronTrigger(minute='*/15'),
         id='checkin_scraper',
         name='Check-in scraper every 15 minutes',
@@ -405,90 +711,132 @@ def setup_scheduler():
     
     # Schedule calendar scraping daily at 3 AM
     scheduler.add_job(
-        func=run_calendar_scraper,
+        func=submit_scrape,
+        args=[run_calendar_scraper],
         trigger=CronTrigger(hour=3, minute=0),
         id='calendar_scraper',
         name='Daily calendar scraper',
         replace_existing=True
     )
     
-    scheduler.start()
+    # Recycle the warm browser daily at 4 AM to reclaim memory
+    scheduler.add_job(
+        func=submit_scrape,
+        args=[recycle_scraper],
+        trigger=CronTrigger(hour=4, minute=0),
+        id='scraper_recycle',
+        name='Daily scraper browser recycle',
+        replace_existing=True
+    )
     
-    # Update next scheduled time
-    jobs = scheduler.get_jobs()
-    if jobs:
-        SCRAPING_STATUS['next_scheduled'] = str(jobs[0].next_run_time)
+    # Keep the Render Free Tier instance awake (it sleeps after 15 mins inactivity)
+    keep_alive_url = _keep_alive_url()
+    if keep_alive_url:
+        scheduler.add_job(
+            func=_ping_self,
+            args=[keep_alive_url],
+            trigger=IntervalTrigger(minutes=14),
+            id='keepalive',
+            name='Keep-alive ping',
+            replace_existing=True
+        )
+    else:
+        logger.warning("RENDER_EXTERNAL_URL not found. Keep-alive disabled.")
+    
+    scheduler.start()
     
     logger.info("✓ Scheduler started")
     logger.info(f"  - Check-in scraping: Every 15 minutes")
     logger.info(f"  - Calendar scraping: Daily at 3:00 AM")
+    logger.info(f"  - Browser recycle: Daily at 4:00 AM")
+    if keep_alive_url:
+        logger.info(f"  - Keep-alive ping: Every 14 minutes ({keep_alive_url})")
     
     return scheduler
 
 
-def start_keep_alive():
-    """Ping the server itself to prevent sleeping on Free Tier"""
-    import requests
-    import time
-    
-    # Get external URL from Render environment
+# Pooled HTTP session for keep-alive pings (reuses the TLS connection between pings)
+_KEEPALIVE_SESSION = requests.Session()
+_KEEPALIVE_SESSION.headers.update({'Connection': 'keep-alive', 'User-Agent': 'keepalive/1.0'})
+# Keep exactly one warm socket to our own host
+_KEEPALIVE_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_KEEPALIVE_SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+
+def _keep_alive_url():
+    """Return the /health URL of this Render service, or None when not running on Render"""
     url = os.environ.get('RENDER_EXTERNAL_URL')
     if not url:
-        logger.warning("RENDER_EXTERNAL_URL not found. Keep-alive disabled.")
-        return
-
+        return None
+    
     # Ensure URL ends with /health
     if not url.endswith('/'):
         url += '/'
-    target_url = url + 'health'
+    return url + 'health'
+
+
+def _ping_self(target_url):
+    """Ping the server itself to prevent sleeping on Free Tier"""
+    try:
+        response = _KEEPALIVE_SESSION.get(target_url, timeout=5)
+        logger.info(f"Keep-alive ping status: {response.status_code}")
+    except Exception as e:
+        logger.error(f"Keep-alive ping failed: {e}")
+
+
+def create_app():
+    """
+    Load saved data and start background jobs exactly once per process, then return the WSGI app.
+    Run with a single worker so the in-memory data and scheduler are shared, e.g.:
+        gunicorn -k gthread -w 1 --threads 8 'api_server:create_app()'
+    """
+    global SCHEDULER
     
-    logger.info(f"Starting keep-alive pinger for {target_url}")
+    with _APP_INIT_LOCK:
+        if SCHEDULER is not None:
+            return app
+        
+        # Check credentials and create data directories once per process
+        try:
+            Config.validate()
+        except ValueError as e:
+            logger.error(f"Invalid configuration: {e}")
+            SCRAPING_STATUS['error'] = str(e)
+        
+        # Load existing data
+        load_latest_data()
+        
+        # Setup scheduler
+        SCHEDULER = setup_scheduler()
+        
+        # Always run initial scrape on startup (on the background worker)
+        logger.info("Running initial scrape on startup...")
+        submit_scrape(run_checkin_scraper)
     
-    def pinger():
-        while True:
-            try:
-                # Sleep for 14 minutes (Render sleeps after 15 mins inactivity)
-                time.sleep(14 * 60)
-                logger.info(f"Pinging {target_url} to keep alive...")
-                response = requests.get(target_url, timeout=10)
-                logger.info(f"Keep-alive ping status: {response.status_code}")
-            except Exception as e:
-                logger.error(f"Keep-alive ping failed: {e}")
-                # Wait a bit before retrying to avoid spamming logs if network is down
-                time.sleep(60)
-
-    # Start pinger in background thread
-    thread = threading.Thread(target=pinger, daemon=True)
-    thread.start()
+    return app
 
 
 if __name__ == '__main__':
+    from waitress import serve
+    
     logger.info("="*80)
     logger.info("BoxMagic API Server Starting...")
     logger.info("="*80)
     
-    # Load existing data
-    load_latest_data()
-    
-    # Setup scheduler
-    scheduler = setup_scheduler()
-    
-    # Always run initial scrape on startup (in background thread)
-    logger.info("Running initial scrape on startup...")
-    initial_scrape_thread = threading.Thread(target=run_checkin_scraper, daemon=True)
-    initial_scrape_thread.start()
+    create_app()
     
-    # Start keep-alive pinger
-    start_keep_alive()
+    # Turn SIGTERM (sent by Render/supervisord on shutdown) into a clean exit
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     
-    # Start Flask server
+    # Start WSGI server
     port = Config.PORT
     logger.info(f"\n✓ API Server running on http://localhost:{port}")
     logger.info(f"✓ CORS enabled for all origins")
     logger.info("="*80 + "\n")
     
     try:
-        app.run(host='0.0.0.0', port=port, debug=False)
+        serve(app, host='0.0.0.0', port=port, threads=8)
     except (KeyboardInterrupt, SystemExit):
         logger.info("Shutting down scheduler...")
-        scheduler.shutdown()
\ No newline at end of file
+        SCHEDULER.shutdown()
+        shutdown_scraper()
\ No newline at end of file
@@ -0,0 +1,8 @@
+import sys
+
+from dotenv import load_dotenv
+
+# Parse .env once per process, however many entry points import config
+if not getattr(sys.modules[__name__], '_DOTENV_LOADED', False):
+    load_dotenv()
+    _DOTENV_LOADED = True
@@ -1,42 +1,116 @@
+import functools
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv()
 
-class Config:
-    # URLs
-    LOGIN_URL = os.getenv('LOGIN_URL', 'https://boxmagic.cl/login')
-    CALENDAR_URL = os.getenv('CALENDAR_URL', 'https://boxmagic.cl/horarios/agenda_general')
-    CHECKIN_URL = os.getenv('CHECKIN_URL', 'https://boxmagic.cl/checkin/clases')
-    
-    # Credentials
-    USERNAME = os.getenv('USERNAME')
-    PASSWORD = os.getenv('PASSWORD')
+# Plain-dict copy of the environment (including .env, loaded by the config package)
+_ENV_SNAPSHOT = dict(os.environ)
+
+
+def _env(key, default=None):
+    """Environment lookup against the startup snapshot"""
+    return _ENV_SNAPSHOT.get(key, default)
+
+
+@functools.cache
+def _env_int(key, default):
+    """Integer environment lookup, memoized per (key, default)"""
+    return int(_env(key, default))
+
+
+class _LazyConfig(type):
+    """Metaclass resolving Config fields on first access and caching them on the class"""
     
-    # Paths
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    DATA_DIR = BASE_DIR / 'data' / 'output'
-    LOG_DIR = BASE_DIR / 'logs'
-    SCREENSHOTS_DIR = BASE_DIR / 'screenshots'
+    def __getattr__(cls, name):
+        resolve = cls._FIELDS.get(name)
+        if resolve is None:
+            raise AttributeError(f"Config has no setting {name!r}")
+        value = resolve(cls)
+        setattr(cls, name, value)
+        return value
+
+
+class Config(metaclass=_LazyConfig):
+    # Lazily resolved settings: name -> resolver(cls), evaluated once on first access
+    _FIELDS = {
+        # URLs
+        'LOGIN_URL': lambda cls: _env('LOGIN_URL', 'https://boxmagic.cl/login'),
+        'CALENDAR_URL': lambda cls: _env('CALENDAR_URL', 'https://boxmagic.cl/horarios/agenda_general'),
+        'CHECKIN_URL': lambda cls: _env('CHECKIN_URL', 'https://boxmagic.cl/checkin/clases'),
+        
+        # Credentials
+        'USERNAME': lambda cls: _env('USERNAME'),
+        'PASSWORD': lambda cls: _env('PASSWORD'),
+        
+        # Paths
+        # Plain path arithmetic; no resolve() and its realpath() syscalls
+        'BASE_DIR': lambda cls: Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'DATA_DIR': lambda cls: cls.BASE_DIR / 'data' / 'output',
+        'LOG_DIR': lambda cls: cls.BASE_DIR / 'logs',
+        'SCREENSHOTS_DIR': lambda cls: cls.BASE_DIR / 'screenshots',
+        # Saved browser storage state (cookies/localStorage), shared by all entry points
+        'SESSION_FILE': lambda cls: cls.DATA_DIR / 'session.json',
+        # Chromium profile (HTTP/code cache) reused across runs; next to output on Render's persistent disk
+        'BROWSER_PROFILE_DIR': lambda cls: Path(_env('BROWSER_PROFILE_DIR') or cls.DATA_DIR.parent / 'chrome_profile'),
+        
+        'TIMEZONE': lambda cls: _env('TIMEZONE', 'America/Mexico_City'),
+        
+        # API/Server settings
+        'PORT': lambda cls: _env_int('PORT', 5000),
+        'FRONTEND_PORT': lambda cls: _env_int('FRONTEND_PORT', 3000),
+        # Frontend URL - use explicit URL if provided, otherwise build from port
+        'FRONTEND_URL': lambda cls: _env('FRONTEND_URL') or f'http://localhost:{cls.FRONTEND_PORT}',
+        
+        # Concurrent check-in API requests (dates / classes fetched in parallel)
+        'CHECKIN_WORKERS': lambda cls: _env_int('CHECKIN_WORKERS', 6),
+        # Browsers scrape_all_coaches spreads coaches over (capped at 3); kept low for anti-bot and memory
+        'COACH_WORKERS': lambda cls: _env_int('COACH_WORKERS', 3),
+        
+        # Check-in page waits (ms): the classes XHR / date picker, then #clases rendering its options
+        'CLASS_LOAD_TIMEOUT_MS': lambda cls: _env_int('CLASS_LOAD_TIMEOUT_MS', 10000),
+        'CLASS_OPTIONS_WAIT_MS': lambda cls: _env_int('CLASS_OPTIONS_WAIT_MS', 1500),
+        # Attempts at reading #clases when the classes API returns nothing
+        'CLASS_LOAD_RETRIES': lambda cls: _env_int('CLASS_LOAD_RETRIES', 3),
+        # Pause between classes/dates fetched one by one through the page (keeps request rate polite)
+        'CHECKIN_PACING_MS': lambda cls: _env_int('CHECKIN_PACING_MS', 1000),
+        
+        # Debug mode: pretty-printed JSON output files
+        'DEBUG': lambda cls: _env('DEBUG', '').lower() in ('1', 'true', 'yes'),
+        # Progress screenshots during coach/calendar scraping; error screenshots are always taken
+        'DEBUG_SCREENSHOTS': lambda cls: _env('DEBUG_SCREENSHOTS', '1' if cls.DEBUG else '').lower() in ('1', 'true', 'yes'),
+    }
     
     # Browser settings
     HEADLESS = False  # Set to True to hide browser
     TIMEOUT = 30000  # 30 seconds in milliseconds
-    TIMEZONE = os.getenv('TIMEZONE', 'America/Mexico_City')
     
-    # API/Server settings
-    PORT = int(os.getenv('PORT', 5000))
-    FRONTEND_PORT = int(os.getenv('FRONTEND_PORT', 3000))
-    # Frontend URL - use explicit URL if provided, otherwise build from port
-    _frontend_url = os.getenv('FRONTEND_URL')
-    FRONTEND_URL = _frontend_url if _frontend_url else f'http://localhost:{FRONTEND_PORT}'
+    # Set once validate() has succeeded; later calls return immediately
+    _VALIDATED = False
+    _instance = None
+    
+    def __new__(cls):
+        # Single shared instance; Config() after the first call returns it
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    def __getattr__(self, name):
+        # Lazy fields live on the class, so resolve them there
+        return getattr(type(self), name)
+    
     
     @classmethod
     def validate(cls):
+        if cls._VALIDATED:
+            return
+        
         if not all([cls.USERNAME, cls.PASSWORD]):
             raise ValueError("Missing USERNAME or PASSWORD in .env file")
         
         cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
         cls.LOG_DIR.mkdir(parents=True, exist_ok=True)
         cls.SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        cls._VALIDATED = True
+
+
+config = Config()
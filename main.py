@@ -0,0 +1,152 @@
+# ========================================
+# File: main.py
+# Command-line entry point - check-in or calendar scraper
+# ========================================
+from config.settings import Config
+from src.scraper_playwright import BoxMagicScraper
+import argparse
+import logging
+from logging.handlers import RotatingFileHandler
+import orjson
+from datetime import datetime
+import os
+import functools
+
+_BANNER80 = "=" * 80
+
+@functools.cache
+def setup_logging(log_file='logs/checkin_scraper.log'):
+    if logging.getLogger().hasHandlers():
+        # Already configured; basicConfig would ignore a second file handler
+        return logging.getLogger(__name__)
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    # One formatter shared by both handlers; explicit datefmt skips the per-record msecs formatting
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', '%Y-%m-%d %H:%M:%S', validate=False)
+    handlers = [RotatingFileHandler(log_file, maxBytes=10_000_000, backupCount=3), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging.basicConfig(level=logging.INFO, handlers=handlers)
+    return logging.getLogger(__name__)
+
+def save_output(data, prefix, now):
+    """Write scraper output to DATA_DIR/<prefix>_<timestamp>.json and return the path"""
+    output_file = Config.DATA_DIR / f'{prefix}_{now.strftime("%Y%m%d_%H%M%S")}.json'
+    json_options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if Config.DEBUG else 0)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(data, option=json_options))
+    return output_file
+
+def run_checkin(scraper, logger):
+    """Scrape check-in data for today + next 7 days and save it"""
+    # Calculate date range (today + next 7 days)
+    today = datetime.now()
+    days_count = 7
+    
+    logger.info("Scraping %d days starting from %s", days_count, today.strftime('%d-%m-%Y'))
+    
+    try:
+        # Scrape check-in data
+        checkin_data = scraper.scrape_checkin_all_dates(
+            start_date=today,
+            days_count=days_count
+        )
+    except Exception as e:
+        logger.error(f"Error during scraping: {str(e)}", exc_info=True)
+        scraper.page.screenshot(path=str(Config.SCREENSHOTS_DIR / 'scraping_error.jpg'), type='jpeg', quality=60)
+        raise
+    
+    # Save check-in data
+    now = datetime.now()
+    if not checkin_data or not checkin_data.get('dates'):
+        logger.warning("⚠ No check-in data returned!")
+        checkin_data = {
+            'error': 'No data scraped',
+            'scrapedAt': now.isoformat(),
+            'dates': {}
+        }
+    
+    checkin_output_file = save_output(checkin_data, 'checkin_data', now)
+    logger.info("\n✓ Check-in data saved to: %s", checkin_output_file)
+    
+    # Print detailed summary (skipped entirely when INFO is disabled)
+    if checkin_data and 'summary' in checkin_data and logger.isEnabledFor(logging.INFO):
+        logger.info("\n%s", _BANNER80)
+        logger.info("CHECK-IN SCRAPING SUMMARY")
+        logger.info(_BANNER80)
+        summary = checkin_data['summary']
+        logger.info("  Total dates processed:    %s", summary.get('totalDates', 0))
+        logger.info("  Total classes found:      %s", summary.get('totalClasses', 0))
+        logger.info("  Total reservations:       %s", summary.get('totalReservations', 0))
+        logger.info("%s\n", _BANNER80)
+        
+        # Print breakdown by date
+        if checkin_data.get('dates'):
+            logger.info("Breakdown by date:")
+            for date_str, date_data in checkin_data['dates'].items():
+                total_res = date_data.get('totalReservations', 0)
+                logger.info("  %s: %d classes, %d reservations", date_str, date_data.get('totalClasses', 0), total_res)
+            logger.info("")
+
+def run_calendar(scraper, logger):
+    """Scrape the calendar with event details and save it"""
+    calendar_data = scraper.scrape_calendar_with_details()
+    
+    now = datetime.now()
+    if not calendar_data or not calendar_data.get('events'):
+        logger.warning("⚠ No calendar data returned!")
+        calendar_data = {
+            'error': 'No data scraped',
+            'scrapedAt': now.isoformat(),
+            'events': []
+        }
+    
+    calendar_output_file = save_output(calendar_data, 'calendar_data', now)
+    logger.info("\n✓ Calendar data saved to: %s", calendar_output_file)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("  Total events: %d", len(calendar_data.get('events', [])))
+
+MODES = {
+    'checkin': run_checkin,
+    'calendar': run_calendar,
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='BoxMagic scraper')
+    parser.add_argument('--mode', choices=sorted(MODES), default='checkin',
+                        help='What to scrape (default: checkin)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger = setup_logging(f'logs/{args.mode}_scraper.log')
+    logger.info(_BANNER80)
+    logger.info("BoxMagic %s Scraper - Starting", args.mode.capitalize())
+    logger.info(_BANNER80)
+    
+    try:
+        Config.validate()
+        
+        scraper = BoxMagicScraper(Config)
+        scraper.start_browser(use_saved_session=True)
+        
+        # Verify browser is ready
+        if not scraper.page:
+            logger.error("Browser page not initialized!")
+            scraper.close()
+            return
+        
+        logger.info("✓ Browser ready. Current URL: %s", scraper.page.url)
+        
+        MODES[args.mode](scraper, logger)
+        
+        scraper.close()
+        
+        logger.info(_BANNER80)
+        logger.info("✓ Scraping completed successfully!")
+        logger.info(_BANNER80)
+    
+    except Exception as e:
+        logger.error(f"\n✗ Fatal error occurred: {str(e)}", exc_info=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,6 +1,8 @@
 from playwright.sync_api import sync_playwright
 from config.settings import Config
-import json
+from src.scraper_playwright import save_storage_state
+
+_BANNER60 = "=" * 60
 
 def manual_login():
     Config.validate()
@@ -13,19 +15,18 @@ def manual_login():
         print("Opening login page...")
         page.goto(Config.LOGIN_URL)
         
-        print("\n" + "="*60)
+        print("\n" + _BANNER60)
         print("PLEASE LOGIN MANUALLY IN THE BROWSER WINDOW")
         print("After logging in successfully, press Enter here...")
-        print("="*60 + "\n")
+        print(_BANNER60 + "\n")
         
         input()
         
         # Save session
         storage_state = context.storage_state()
-        storage_file = Config.BASE_DIR / 'session.json'
+        storage_file = Config.SESSION_FILE
         
-        with open(storage_file, 'w') as f:
-            json.dump(storage_state, f, indent=2)
+        save_storage_state(storage_file, storage_state)
         
         print(f"✓ Session saved to {storage_file}")
         page.screenshot(path=str(Config.SCREENSHOTS_DIR / 'logged_in.png'))
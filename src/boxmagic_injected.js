@@ -0,0 +1,136 @@
+// ========================================
+// File: src/boxmagic_injected.js
+// Page helpers installed once per browser context (add_init_script),
+// so each evaluate only sends a short call instead of the whole script
+// ========================================
+(() => {
+    // Matches "FirstName LastName"
+    const NAME_RE = /[A-Z][a-z]+\s+[A-Z][a-z]+/;
+    // Generic dropdown labels that are not coaches
+    const SKIP = new Set(['', 'Profesor', 'Seleccionar', 'Todos']);
+    // Modal text helpers, compiled once per page
+    const NAMES_RE = /[A-Z][a-z]+\s+[A-Z][a-z]+/g;
+    const TEACHERS_RE = /Profesores asignados:\s*([^Select]+?)(?=Select|Sala|$)/;
+    const VALUE_END_RE = /\n|\s{2,}/;
+    const EVENT_SELECTOR = '.fc-time-grid-event.fc-v-event.fc-event';
+    const MODAL_SELECTOR = '.modal-content, [role="dialog"], .modal';
+    // Modal close controls, by class/attribute first, then by button label
+    const MODAL_CLOSE_SELECTOR = '.modal-close, [aria-label="Close"], button.close';
+    const MODAL_CLOSE_LABELS = ['Cerrar', 'Close'];
+    // Modal label prefix -> field name
+    const MODAL_LABELS = [
+        ['Día:', 'day'],
+        ['Clase:', 'className'],
+        ['Programa', 'program'],
+        ['Hora Inicio:', 'startTime'],
+        ['Hora Fin:', 'endTime'],
+        ['Cupos de clientes por clase:', 'capacity'],
+        ['Clase de prueba:', 'trialClass'],
+        ['Clase Online', 'onlineClass'],
+        ['Clase libre', 'freeClass']
+    ];
+    const MODAL_KEYS = new Map(MODAL_LABELS);
+    // No label is a prefix of another, so at most one alternative matches the start of a text
+    const MODAL_LABEL_RE = new RegExp(
+        '^(' + MODAL_LABELS.map(([label]) => label.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|') + ')'
+    );
+
+    const isCoachSelect = (select) =>
+        Array.from(select.options).some(opt => opt.text.includes('Profesor') || NAME_RE.test(opt.text));
+
+    window.__boxmagic = {
+        // Finds the Profesor dropdown, tags it with data-coach-select and returns
+        // {selector, names} as a JSON string (null if not found). `selector` is a stable
+        // id/name selector for the dropdown; passing it back on later pages skips the search.
+        getCoaches(knownSelector) {
+            let select = knownSelector ? document.querySelector(knownSelector) : null;
+            // Stable attributes next; only scan every select's options if none match
+            if (!select) {
+                select = document.querySelector(
+                    'select[name*="profesor" i], select[id*="profesor" i], select[name*="coach" i], select[id*="coach" i]'
+                );
+            }
+            if (!select) {
+                select = Array.from(document.querySelectorAll('select')).find(isCoachSelect);
+            }
+            if (!select) return null;
+
+            select.setAttribute('data-coach-select', '1');
+
+            // Return all non-empty options, excluding generic labels
+            const names = [];
+            for (const opt of select.options) {
+                const text = opt.text.trim();
+                if (opt.value !== '' && !SKIP.has(text)) names.push(text);
+            }
+            let selector = null;
+            if (select.id) selector = `select#${CSS.escape(select.id)}`;
+            else if (select.name) selector = `select[name="${CSS.escape(select.name)}"]`;
+            return JSON.stringify({ selector, names });
+        },
+
+        // Calendar events as a JSON string [styles, rows]: one raw [text, styleIndex] row per event.
+        // Events in the same time slot on different days share a style, so each distinct style is sent once
+        // (time parsing happens in Python)
+        readEvents() {
+            const styles = [];
+            const styleIndex = new Map();
+            const rows = Array.from(document.querySelectorAll(EVENT_SELECTOR), element => {
+                const style = element.getAttribute('style') || '';
+                let i = styleIndex.get(style);
+                if (i === undefined) {
+                    i = styles.push(style) - 1;
+                    styleIndex.set(style, i);
+                }
+                return [element.textContent.trim(), i];
+            });
+            return JSON.stringify([styles, rows]);
+        },
+
+        // Clicks the open modal's close control in a single call; false if there is none
+        closeModal() {
+            let button = document.querySelector(MODAL_CLOSE_SELECTOR);
+            if (!button) {
+                button = Array.from(document.querySelectorAll('button')).find(
+                    b => MODAL_CLOSE_LABELS.some(label => b.textContent.includes(label))
+                );
+            }
+            if (!button) return false;
+            button.click();
+            return true;
+        },
+
+        // Details of the open event modal (null if no modal is open)
+        readModal() {
+            const modal = document.querySelector(MODAL_SELECTOR);
+            if (!modal) return null;
+
+            // Every label is resolved in one pass over the modal with one regex test per element
+            // (label -> field lookup is a Map); first matching element wins
+            const out = {};
+            let remaining = MODAL_LABELS.length;
+            for (const el of modal.querySelectorAll('*')) {
+                const text = el.textContent.trim();
+                const labelMatch = MODAL_LABEL_RE.exec(text);
+                if (!labelMatch) continue;
+                const key = MODAL_KEYS.get(labelMatch[1]);
+                if (key in out) continue;
+                const value = text.slice(labelMatch[1].length).trim();
+                out[key] = value.split(VALUE_END_RE)[0].trim() || null;
+                if (--remaining === 0) break;
+            }
+            for (const [, key] of MODAL_LABELS) {
+                if (!(key in out)) out[key] = null;
+            }
+
+            let teachers = null;
+            const match = TEACHERS_RE.exec(modal.textContent);
+            if (match) {
+                const names = match[1].match(NAMES_RE) || [];
+                teachers = [...new Set(names)].join(', ');
+            }
+
+            return { ...out, teachers };
+        }
+    };
+})();
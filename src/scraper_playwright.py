@@ -4,28 +4,323 @@
 # ENHANCED VERSION - Coach filtering + data extraction
 # ========================================
 from playwright.sync_api import sync_playwright, Page, TimeoutError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import atexit
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import json
+import orjson
 import time
 import os
+import queue
 import re
 import subprocess
+import sys
+import fcntl
+import functools
 from zoneinfo import ZoneInfo
+import requests
+from requests.adapters import HTTPAdapter
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+# Static assets aborted in every browser context
+BLOCKED_RESOURCES = '**/*.{png,jpg,jpeg,gif,webp,svg,woff,woff2,ttf,mp4}'
+# Analytics/ad/avatar hosts aborted as well (matched by URL, so other requests never hit Python)
+BLOCKED_HOSTS = re.compile(
+    r'^https?://([^/]+\.)?(google-analytics\.com|googletagmanager\.com|doubleclick\.net'
+    r'|hotjar\.com|facebook\.net|facebook\.com/tr|gravatar\.com|segment\.io|segment\.com)'
+)
+# Same filter as URL patterns for CDP's Network.setBlockedURLs (matched inside Chromium, no Python callback)
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.woff', '*.woff2', '*.ttf', '*.mp4',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*hotjar.com*',
+    '*facebook.net*', '*facebook.com/tr*', '*gravatar.com*', '*segment.io*', '*segment.com*',
+]
+# Init script hooking pace.js's own start/done events into window.__paceReady
+# (stays null if pace.js never registers as window.Pace, e.g. under AMD)
+PACE_READY_INIT_JS = '''
+    (() => {
+        window.__paceReady = null;
+        let pace;
+        Object.defineProperty(window, 'Pace', {
+            configurable: true,
+            get() { return pace; },
+            set(value) {
+                pace = value;
+                if (value && typeof value.on === 'function') {
+                    window.__paceReady = false;
+                    value.on('start', () => { window.__paceReady = false; });
+                    value.on('restart', () => { window.__paceReady = false; });
+                    value.on('done', () => { window.__paceReady = true; });
+                }
+            }
+        });
+    })();
+'''
+# Page/AJAX loading finished: pace's done event, or the .pace-done class when pace wasn't hooked
+PACE_READY_JS = "() => window.__paceReady === true || (window.__paceReady == null && !!document.querySelector('.pace-done'))"
+# "HH:MM - HH:MM" time range in a calendar event's text
+EVENT_TIME_RE = re.compile(r'(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})')
+# clase_id-dias_clases_id inside a #clases option value (e.g. "104996-237092")
+CLASS_VALUE_RE = re.compile(r'(\d+-\d+)')
+# A whole class_id in that format
+CLASS_ID_RE = re.compile(r'^\d+-\d+$')
+# <option value="...">text</option> in an HTML classes response
+OPTION_RE = re.compile(r'<option\s+value=["\']([^"\']+)["\'][^>]*>([^<]*)</option>', re.I)
+# Placeholder option labels that aren't classes
+OPTION_PLACEHOLDERS = ('Selecciona', 'Seleccionar', 'Select')
+# Calendar loaded and rendered: pace finished (see PACE_READY_JS) and at least one timed event is on the grid
+CALENDAR_READY_JS = '''
+    () => (window.__paceReady === true || (window.__paceReady == null && !!document.querySelector('.pace-done')))
+        && !document.querySelector('.pace-running, .pace-active')
+        && !!document.querySelector('.fc-time-grid-event')
+'''
+# Login submitted and settled: off the login URL, on the intermediate user page, or the form is gone
+LOGIN_SETTLED_JS = '''
+    () => !location.href.toLowerCase().includes('login')
+        || !!document.querySelector('.Ui2Boton')
+        || !document.querySelector('input[type="password"]')
+'''
+# True if the page text names the intermediate user page (checked in the browser; only a bool comes back)
+INTERMEDIATE_PAGE_JS = '''
+    () => {
+        const t = (document.body.innerText || '').toLowerCase();
+        return t.includes('admin panel') || t.includes('access to sessions') || t.includes('not your account');
+    }
+'''
+# Login form fields/buttons, tried as one combined locator each (see _any_locator)
+USERNAME_SELECTORS = (
+    'input[type="email"]',
+    'input[name="email"]',
+    'input[name="username"]',
+    'input[name="user"]',
+    'input[id*="email"]',
+    'input[id*="username"]',
+    'input[placeholder*="email" i]',
+    'input[placeholder*="usuario" i]',
+    'input[id*=info_reserva]',
+)
+PASSWORD_SELECTORS = (
+    'input[type="password"]',
+    'input[name="password"]',
+    'input[name="pass"]',
+    'input[id*="password"]',
+)
+LOGIN_BUTTON_SELECTORS = (
+    'button[type="submit"]',
+    'input[type="submit"]',
+    'button:has-text("Login")',
+    'button:has-text("Iniciar")',
+    'button:has-text("Entrar")',
+    'button:has-text("Sign in")',
+    'button.login',
+    'button[class*="login"]',
+)
+# "Admin panel" on the intermediate user page: a <div class="Ui2Boton"> holding a button and the label text.
+# XPath 1.0 has no lower-case(), so translate() makes the text match case-insensitive
+_ADMIN_PANEL_TEXT = "contains(translate(normalize-space(.), 'ADMINPEL', 'adminpel'), 'admin panel')"
+_ADMIN_PANEL_BOX = f"//div[contains(concat(' ', normalize-space(@class), ' '), ' Ui2Boton ')][{_ADMIN_PANEL_TEXT}]"
+# The button inside that box (or an "Admin panel" link/button elsewhere), in one query
+ADMIN_PANEL_BUTTON_XPATH = f"xpath=({_ADMIN_PANEL_BOX}//button | //a[{_ADMIN_PANEL_TEXT}] | //button[{_ADMIN_PANEL_TEXT}])[1]"
+# Last resort when the box has no button: click the box itself
+ADMIN_PANEL_BOX_XPATH = f"xpath=({_ADMIN_PANEL_BOX})[1]"
+# Calendar controls
+COACH_DROPDOWN_SELECTORS = (
+    'select:has-text("Profesor")',
+    'select[name*="profesor"]',
+    'select[name*="coach"]',
+)
+FILTER_BUTTON_SELECTORS = (
+    'button:has-text("Filtrar")',
+    'button:has-text("Filter")',
+    'input[type="submit"]:has-text("Filtrar")',
+    'a:has-text("Filtrar")',
+    '.btn:has-text("Filtrar")',
+    '[value="Filtrar"]',
+)
+# Substrings of BoxMagic cookie names that carry the login session
+AUTH_COOKIE_HINTS = ('session', 'token', 'auth', 'remember')
+# Upper bound on concurrent coach browsers; more trips the site's anti-bot checks and risks OOM on small instances
+MAX_COACH_WORKERS = 3
+# calendar_events_*.jsonl files (scrape_all_coaches(stream_to_file=True)) kept in DATA_DIR, same as the API backups
+EVENTS_FILE_RETENTION = 48
+# The coach <select> is tagged with this attribute once found, so it can be re-queried cheaply
+COACH_SELECT = 'select[data-coach-select]'
+# Seeds the saved session's localStorage (storage_state 'origins') for the page's origin; persistent contexts
+# take no storage_state. Runs on every navigation, so keys the page already has are left alone
+ORIGINS_SEED_JS = '''
+    (origins => {
+        const saved = origins.find(o => o.origin === location.origin);
+        if (!saved) return;
+        try {
+            for (const { name, value } of saved.localStorage || []) {
+                if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+            }
+        } catch (e) {}
+    })(%s)
+'''
+# Page helpers (window.__boxmagic) installed once per context instead of sent with each evaluate
+INJECTED_JS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boxmagic_injected.js')
+# Details of the open event modal once its body is populated (falsy until then), for wait_for_function
+MODAL_READY_DETAILS_JS = '''
+    () => Array.from(document.querySelectorAll('.modal-content, [role="dialog"], .modal'))
+            .some(m => (m.innerText || '').includes('Hora Inicio:'))
+        && window.__boxmagic.readModal()
+'''
+# True once the #clases dropdown holds options beyond its placeholder
+CLASS_OPTIONS_READY_JS = "() => (document.querySelector('#clases')?.options.length || 0) > 1"
+# Candidate classes-for-date endpoints ({date} is DD-MM-YYYY), tried in order
+CLASSES_ENDPOINTS = (
+    'https://boxmagic.cl/checkin/date_get_clases/{date}',
+    'https://boxmagic.cl/checkin/get_clases?fecha_where={date}',
+    'https://boxmagic.cl/checkin/clases_select?fecha_where={date}',
+)
+# Max parsed class-list payloads kept per scraper before the cache is reset
+CLASSES_PARSE_CACHE_SIZE = 256
+# Headers BoxMagic expects on its check-in XHR endpoints
+API_HEADERS = {'X-Requested-With': 'XMLHttpRequest', 'Accept': 'application/json, text/javascript, */*; q=0.01'}
+# Seconds to establish a connection to BoxMagic before an API call gives up (read timeouts are per call)
+API_CONNECT_TIMEOUT = 5
+
+# Parsed session file shared by every scraper in the process: (path, mtime, storage_state)
+_STORAGE_STATE_CACHE = None
+
+
+def load_storage_state(session_file):
+    """Return the saved storage state, re-reading the file only when it has changed"""
+    global _STORAGE_STATE_CACHE
+    
+    mtime = session_file.stat().st_mtime
+    cached = _STORAGE_STATE_CACHE
+    if cached is not None and cached[0] == session_file and cached[1] == mtime:
+        return cached[2]
+    
+    storage_state = orjson.loads(session_file.read_bytes())
+    _STORAGE_STATE_CACHE = (session_file, mtime, storage_state)
+    return storage_state
+
+
+def install_browsers(browsers_path):
+    """
+    Install Chromium into browsers_path, holding an exclusive lock so concurrent scraper
+    processes starting cold don't both download it. Re-checks after taking the lock.
+    """
+    browsers_path.mkdir(parents=True, exist_ok=True)
+    lock_path = browsers_path.with_suffix('.lock')
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if any(browsers_path.iterdir()):
+                logger.info("✓ Browsers installed by another process")
+                return
+            logger.info("Browsers not found on persistent disk. Installing...")
+            # Same interpreter's playwright module, no reliance on the CLI script being on PATH
+            subprocess.run([sys.executable, '-m', 'playwright', 'install', 'chromium'], check=True)
+            logger.info("✓ Browsers installed successfully to persistent disk")
+        except Exception as e:
+            logger.error(f"Failed to install browsers: {e}")
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _is_classes_response(response) -> bool:
+    """True for the check-in page's classes-for-date XHR (not the reservations one)"""
+    url = response.url
+    return '/checkin/' in url and 'clases' in url and 'get_alumnos_clase' not in url
+
+
+def _write_bytes(path, data):
+    """Write a file in one call (background screenshot writes)"""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+@functools.lru_cache(maxsize=64)
+def _to_iso_date(date_str: str) -> str:
+    """DD-MM-YYYY -> YYYY-MM-DD (cached: every class of a date converts the same string)"""
+    return datetime.strptime(date_str, "%d-%m-%Y").strftime("%Y-%m-%d")
+
+
+def _url_path(url):
+    """URL without its query string and fragment, for same-page comparisons"""
+    return url.split('#', 1)[0].split('?', 1)[0].rstrip('/')
+
+
+def auth_cookies_fresh(storage_state, now=None):
+    """
+    True if the saved BoxMagic auth cookies all carry an explicit, future expiry.
+    Session-only cookies (expires -1) say nothing about the server session, so they don't count.
+    """
+    now = time.time() if now is None else now
+    expiries = [
+        cookie.get('expires', -1)
+        for cookie in storage_state.get('cookies', ())
+        if 'boxmagic' in cookie.get('domain', '')
+        and any(hint in cookie.get('name', '').lower() for hint in AUTH_COOKIE_HINTS)
+    ]
+    known = [expires for expires in expiries if expires > 0]
+    # Small margin so a cookie doesn't expire mid-scrape
+    return bool(known) and min(known) > now + 60
+
+
+def save_storage_state(session_file, storage_state):
+    """
+    Write the storage state compactly and atomically (temp file + rename), priming the load cache.
+    Only machines read this file, so it is not indented.
+    """
+    global _STORAGE_STATE_CACHE
+    
+    tmp_path = session_file.with_suffix(session_file.suffix + '.tmp')
+    tmp_path.write_bytes(orjson.dumps(storage_state))
+    os.replace(tmp_path, session_file)
+    _STORAGE_STATE_CACHE = (session_file, session_file.stat().st_mtime, storage_state)
+
+
+def reset_storage_state_cache():
+    """Forget the cached storage state (e.g. after the saved session turned out to be expired)"""
+    global _STORAGE_STATE_CACHE
+    _STORAGE_STATE_CACHE = None
+
 class BoxMagicScraper:
     """
     Scraper for BoxMagic calendar using Playwright
     """
     
-    def __init__(self, config):
+    def __init__(self, config, headless=True):
         self.config = config
+        self.headless = headless
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
         self.is_logged_in = False
+        # Screenshot directory as a path prefix, so per-event progress screenshots skip Path joins
+        self._screenshots_prefix = str(config.SCREENSHOTS_DIR) + os.sep
+        # Writes progress screenshots to disk off the page thread (created on first _snap, drained on close)
+        self._io_pool = None
+        # Cookie-seeded HTTP session for check-in API calls, open only during scrape_checkin_all_dates
+        self._http = None
+        # Coach <select> handle, found once per page load (reset on navigation)
+        self._coach_select_handle = None
+        # "Filtrar" button handle, found on the first filter of a page load (reset on navigation)
+        self._filter_btn_handle = None
+        # True once get_alumnos_clase only answered for YYYY-MM-DD dates; that format is then tried first
+        self._alumnos_iso_dates = False
+        # Set once Escape fails to close an event modal; later modals are closed with the close button directly
+        self._modal_close_by_click = False
+        # URL template ({date} placeholder) of the classes endpoint that last answered, tried first for later dates
+        self._classes_endpoint = None
+        # Parsed class lists keyed by raw payload (see _parse_classes_from_api_response)
+        self._classes_parse_cache = {}
+        # Stable id/name selector of the coach <select>, remembered across page loads
+        self._coach_select_selector = None
+        # Combined locators built by _any_locator for the current page, keyed by selector tuple
+        self._locators = {}
+        # Coach names for the current session (reset on login)
+        self._coaches_cache = None
+        # Coach the loaded calendar is currently filtered by (None = unfiltered)
+        self._filtered_coach = None
     
     def login(self) -> bool:
         """
@@ -37,83 +332,35 @@ class BoxMagicScraper:
             
             # Navigate to login page
             logger.info(f"Navigating to login page: {self.config.LOGIN_URL}")
-            self.page.goto(self.config.LOGIN_URL, wait_until='networkidle')
-            self.page.wait_for_timeout(2000)
-            
-            # Try multiple selectors for username/email field
-            username_selectors = [
-                'input[type="email"]',
-                'input[name="email"]',
-                'input[name="username"]',
-                'input[name="user"]',
-                'input[id*="email"]',
-                'input[id*="username"]',
-                'input[placeholder*="email" i]',
-                'input[placeholder*="usuario" i]',
-                'input[id*=info_reserva]',
-                
-            ]
-            
-            username_filled = False
-            for selector in username_selectors:
-                try:
-                    if self.page.locator(selector).count() > 0:
-                        self.page.fill(selector, self.config.USERNAME)
-                        logger.info(f"✓ Username filled using selector: {selector}")
-                        username_filled = True
-                        break
-                except:
-                    continue
+            self.page.goto(self.config.LOGIN_URL, wait_until='domcontentloaded')
+            # Proceed as soon as the form is interactive
+            try:
+                self.page.wait_for_selector('input[type="password"], input[type="email"]', state='visible', timeout=self.config.TIMEOUT)
+            except Exception:
+                logger.warning("Login form not visible yet, trying selectors anyway")
             
-            if not username_filled:
-                logger.error("Could not find username/email field")
+            # One combined locator per field: a single resolve+fill instead of a count() per selector
+            try:
+                self._any_locator(USERNAME_SELECTORS).fill(self.config.USERNAME, timeout=5000)
+                logger.info("✓ Username filled")
+            except Exception as e:
+                logger.error(f"Could not find username/email field: {e}")
                 return False
             
-            # Try multiple selectors for password field
-            password_selectors = [
-                'input[type="password"]',
-                'input[name="password"]',
-                'input[name="pass"]',
-                'input[id*="password"]',
-            ]
-            
-            password_filled = False
-            for selector in password_selectors:
-                try:
-                    if self.page.locator(selector).count() > 0:
-                        self.page.fill(selector, self.config.PASSWORD)
-                        logger.info(f"✓ Password filled using selector: {selector}")
-                        password_filled = True
-                        break
-                except:
-                    continue
-            
-            if not password_filled:
-                logger.error("Could not find password field")
+            try:
+                self._any_locator(PASSWORD_SELECTORS).fill(self.config.PASSWORD, timeout=5000)
+                logger.info("✓ Password filled")
+            except Exception as e:
+                logger.error(f"Could not find password field: {e}")
                 return False
             
-            # Try multiple selectors for login button
-            login_button_selectors = [
-                'button[type="submit"]',
-                'input[type="submit"]',
-                'button:has-text("Login")',
-                'button:has-text("Iniciar")',
-                'button:has-text("Entrar")',
-                'button:has-text("Sign in")',
-                'button.login',
-                'button[class*="login"]',
-            ]
-            
             button_clicked = False
-            for selector in login_button_selectors:
-                try:
-                    if self.page.locator(selector).count() > 0:
-                        self.page.click(selector)
-                        logger.info(f"✓ Login button clicked using selector: {selector}")
-                        button_clicked = True
-                        break
-                except:
-                    continue
+            try:
+                self._any_locator(LOGIN_BUTTON_SELECTORS).click(timeout=5000)
+                logger.info("✓ Login button clicked")
+                button_clicked = True
+            except Exception as e:
+                logger.debug(f"Login button selectors failed: {e}")
             
             if not button_clicked:
                 # Try pressing Enter on password field
@@ -121,15 +368,19 @@ class BoxMagicScraper:
                     self.page.keyboard.press('Enter')
                     logger.info("✓ Login attempted via Enter key")
                     button_clicked = True
-                except:
+                except Exception:
                     pass
             
             if not button_clicked:
                 logger.error("Could not find or click login button")
                 return False
             
-            # Wait for navigation after login
-            self.page.wait_for_timeout(3000)
+            # Wait until we left the login form: new URL, the intermediate user page, or the form gone
+            try:
+                self.page.wait_for_function(LOGIN_SETTLED_JS, timeout=self.config.TIMEOUT)
+                self.page.wait_for_load_state('domcontentloaded')
+            except Exception as e:
+                logger.debug(f"Post-login wait ended without a page change: {e}")
             
             # Check if login was successful
             current_url = self.page.url
@@ -144,33 +395,25 @@ class BoxMagicScraper:
             is_intermediate_page = False
             try:
                 # Check for Ui2Boton divs (these are the button containers)
-                if self.page.locator('.Ui2Boton').count() > 0:
+                if self.page.query_selector('.Ui2Boton') is not None:
                     is_intermediate_page = True
                     logger.info("Detected intermediate user selection page (Ui2Boton found)")
-            except:
+            except Exception:
                 pass
             
-            # Also check by looking for "Admin panel" text
-            admin_panel_selectors = [
-                '.Ui2Boton:has-text("Admin panel") button[aria-label="Boton"]',
-                '.Ui2Boton:has-text("Admin panel") button',
-                'div.Ui2Boton:has-text("Admin panel")',
-                'button[aria-label="Boton"]',  # Generic fallback - will need to find the right one
-                'a:has-text("Admin panel")',
-                'a:has-text("Admin Panel")',
-                'button:has-text("Admin panel")',
-            ]
-            
             # Also check by URL pattern and page content
             if 'auth.boxmagic.cl/login' in current_url:
                 try:
-                    # Wait a bit for page to load
-                    self.page.wait_for_timeout(1000)
-                    page_text = self.page.locator('body').inner_text().lower()
-                    if 'admin panel' in page_text or 'access to sessions' in page_text or 'not your account' in page_text:
+                    # Give the Ui2 buttons a moment to render; a timeout just means no Ui2Boton yet
+                    try:
+                        self.page.wait_for_selector('.Ui2Boton', timeout=2000)
+                        is_intermediate_page = True
+                    except Exception:
+                        pass
+                    if not is_intermediate_page and self.page.evaluate(INTERMEDIATE_PAGE_JS):
                         is_intermediate_page = True
                         logger.info("Detected intermediate page by URL and content")
-                except:
+                except Exception:
                     pass
             
             # If on intermediate page, click "Admin panel"
@@ -178,70 +421,25 @@ class BoxMagicScraper:
                 logger.info("Clicking 'Admin panel' to proceed...")
                 admin_clicked = False
                 
-                # Try specific selectors first
-                for selector in admin_panel_selectors:
+                for xpath in (ADMIN_PANEL_BUTTON_XPATH, ADMIN_PANEL_BOX_XPATH):
                     try:
-                        if self.page.locator(selector).count() > 0:
-                            self.page.click(selector)
-                            logger.info(f"✓ Clicked 'Admin panel' using selector: {selector}")
-                            admin_clicked = True
-                            break
+                        self.page.locator(xpath).click(timeout=2000)
+                        logger.info("✓ Clicked 'Admin panel'")
+                        admin_clicked = True
+                        break
                     except Exception as e:
-                        logger.debug(f"Selector {selector} failed: {e}")
-                        continue
+                        logger.debug(f"Admin panel not clickable via {xpath}: {e}")
                 
-                # If specific selectors didn't work, use JavaScript to find the correct button
                 if not admin_clicked:
-                    try:
-                        clicked = self.page.evaluate('''
-                            () => {
-                                // Find all Ui2Boton divs
-                                const botones = document.querySelectorAll('.Ui2Boton');
-                                for (let botonDiv of botones) {
-                                    // Check if this div contains "Admin panel" text
-                                    const text = botonDiv.textContent || botonDiv.innerText || '';
-                                    if (text.toLowerCase().includes('admin panel')) {
-                                        // Find the button inside this div
-                                        const button = botonDiv.querySelector('button[aria-label="Boton"]') || 
-                                                      botonDiv.querySelector('button');
-                                        if (button) {
-                                            button.click();
-                                            return true;
-                                        }
-                                        // If no button found, click the div itself
-                                        botonDiv.click();
-                                        return true;
-                                    }
-                                }
-                                
-                                // Fallback: find any button with aria-label="Boton" near "Admin panel" text
-                                const allButtons = document.querySelectorAll('button[aria-label="Boton"]');
-                                for (let btn of allButtons) {
-                                    const parent = btn.closest('.Ui2Boton');
-                                    if (parent) {
-                                        const text = parent.textContent || parent.innerText || '';
-                                        if (text.toLowerCase().includes('admin panel')) {
-                                            btn.click();
-                                            return true;
-                                        }
-                                    }
-                                }
-                                
-                                return false;
-                            }
-                        ''')
-                        if clicked:
-                            logger.info("✓ Clicked 'Admin panel' via JavaScript (targeting Ui2Boton structure)")
-                            admin_clicked = True
-                        else:
-                            logger.warning("Could not find Admin panel button via JavaScript")
-                    except Exception as e:
-                        logger.warning(f"Could not click Admin panel via JavaScript: {e}")
+                    logger.warning("Could not find Admin panel button")
                 
                 if admin_clicked:
                     # Wait for navigation after clicking Admin panel
-                    self.page.wait_for_timeout(3000)
-                    self.page.wait_for_load_state('networkidle', timeout=60000)
+                    try:
+                        self.page.wait_for_url(lambda url: 'login' not in url.lower(), wait_until='domcontentloaded', timeout=60000)
+                    except Exception:
+                        # The URL check below reports the failure; waiting for network idle wouldn't change it
+                        logger.warning("Still on the login URL after clicking Admin panel")
                     current_url = self.page.url
                     logger.info(f"Current URL after clicking Admin panel: {current_url}")
             
@@ -250,30 +448,26 @@ class BoxMagicScraper:
                 logger.info("✓ Login successful and navigated to application!")
                 
                 # Save session for future use
-                session_file = self.config.DATA_DIR / 'session.json'
-                storage_state = self.context.storage_state()
-                with open(session_file, 'w') as f:
-                    json.dump(storage_state, f, indent=2)
-                logger.info(f"✓ Session saved to {session_file}")
-                
                 self.is_logged_in = True
+                self.refresh_session()
+                self._coaches_cache = None
                 return True
             else:
                 logger.error("Login failed - still on login page")
-                self.page.screenshot(
-                    path=str(self.config.SCREENSHOTS_DIR / 'login_failed.png')
-                )
+                self._snap_error('login_failed.jpg')
                 return False
                 
         except Exception as e:
             logger.error(f"Error during login: {str(e)}", exc_info=True)
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / 'login_error.png')
-            )
+            self._snap_error('login_error.jpg')
             return False
     
-    def start_browser(self, use_saved_session=True, auto_login=True):
-        """Initialize browser and optionally login"""
+    def start_browser(self, use_saved_session=True, auto_login=True, storage_state=None):
+        """
+        Initialize browser and optionally login
+        storage_state: Optional in-memory session from a scraper that is already logged in;
+                       used as-is instead of the session file, without re-verifying it
+        """
         is_render = os.getenv("RENDER", None) is not None
         logger.info("Starting browser...")
         # Force set the browsers path if on Render
@@ -287,61 +481,96 @@ class BoxMagicScraper:
             
             # Check if browsers are installed
             if not persistent_browsers_path.exists() or not any(persistent_browsers_path.iterdir()):
-                logger.info("Browsers not found on persistent disk. Installing...")
-                try:
-                    subprocess.run(['playwright', 'install', 'chromium'], check=True)
-                    logger.info("✓ Browsers installed successfully to persistent disk")
-                except Exception as e:
-                    logger.error(f"Failed to install browsers: {e}")
+                install_browsers(persistent_browsers_path)
             else:
                 logger.info("✓ Browsers found on persistent disk")
 
         self.playwright = sync_playwright().start()
         
-        self.browser = self.playwright.chromium.launch(
-        headless=True,
-        args=["--no-sandbox", "--disable-setuid-sandbox"]
-    )
-        
-        session_file = self.config.DATA_DIR / 'session.json'
-        storage_state = None
+        session_file = self.config.SESSION_FILE
+        trusted_state = storage_state is not None
         session_valid = False
         
-        if use_saved_session and session_file.exists():
+        if not trusted_state and use_saved_session and session_file.exists():
             try:
                 logger.info("Loading saved session...")
-                with open(session_file, 'r') as f:
-                    storage_state = json.load(f)
+                storage_state = load_storage_state(session_file)
                 session_valid = True
             except Exception as e:
                 logger.warning(f"Could not load session file: {e}")
         
-        self.context = self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            storage_state=storage_state
-        )
+        launch_args = ["--no-sandbox", "--disable-setuid-sandbox"]
+        context_options = {
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': USER_AGENT,
+        }
         
-        self.page = self.context.new_page()
+        # Persistent profile keeps the HTTP disk cache and V8 code cache (the SPA bundle) across runs.
+        # Workers seeded with an in-memory session run concurrently, so they get throwaway contexts.
+        self.context = None
+        if not trusted_state:
+            profile_dir = self.config.BROWSER_PROFILE_DIR
+            try:
+                self.context = self.playwright.chromium.launch_persistent_context(
+                    str(profile_dir),
+                    headless=self.headless,
+                    args=launch_args,
+                    **context_options
+                )
+                # Persistent contexts take no storage_state; the saved cookies and localStorage are applied on top
+                if storage_state and storage_state.get('cookies'):
+                    self.context.add_cookies(storage_state['cookies'])
+                if storage_state and storage_state.get('origins'):
+                    self.context.add_init_script(ORIGINS_SEED_JS % orjson.dumps(storage_state['origins']).decode())
+                logger.info(f"Using persistent browser profile: {profile_dir}")
+            except Exception as e:
+                # e.g. the profile is locked by another running scraper
+                logger.warning(f"Could not open browser profile {profile_dir}: {e}, using a fresh context")
+                self.context = None
         
+        if self.context is None:
+            self.browser = self.playwright.chromium.launch(headless=self.headless, args=launch_args)
+            self.context = self.browser.new_context(storage_state=storage_state, **context_options)
+        # Runs on every navigation, so pace readiness is tracked without re-injecting anything
+        self.context.add_init_script(PACE_READY_INIT_JS)
+        self.context.add_init_script(path=INJECTED_JS_PATH)
+        
+        # A persistent context opens with a blank tab already
+        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        self._block_requests()
+        self._locators = {}
+        self.page.on('framenavigated', self._on_frame_navigated)
+        
+        if trusted_state:
+            self.is_logged_in = True
+        # Unexpired auth cookies: trust the saved session without a verification navigation
+        elif session_valid and storage_state and auth_cookies_fresh(storage_state):
+            self.is_logged_in = True
+            logger.info("✓ Logged in using saved session (auth cookies unexpired)")
         # Verify session is still valid by checking if we're logged in
-        if session_valid and storage_state:
+        elif session_valid and storage_state:
             try:
-                # Navigate to a protected page to verify session
-                self.page.goto(self.config.CHECKIN_URL, wait_until='networkidle', timeout=10000)
-                self.page.wait_for_timeout(2000)
+                # Navigate to a protected page to verify session (server redirects to login happen before DOMContentLoaded)
+                self.page.goto(self.config.CHECKIN_URL, wait_until='domcontentloaded', timeout=10000)
                 
                 # Check if we're redirected to login (session invalid)
                 if 'login' in self.page.url.lower():
                     logger.warning("Saved session appears to be invalid, will attempt login")
+                    reset_storage_state_cache()
                     session_valid = False
                 else:
                     self.is_logged_in = True
                     logger.info("✓ Logged in using saved session")
+                    # Loading a protected page may have rotated cookies; keep them for the next run
+                    self.refresh_session()
             except Exception as e:
                 logger.warning(f"Could not verify session: {e}, will attempt login")
                 session_valid = False
         
+        # Owner of session.json (not a worker borrowing a state): also save it on interpreter exit
+        if not trusted_state:
+            atexit.register(self._save_session_at_exit)
+        
         # If no valid session, attempt automatic login
         if not self.is_logged_in and auto_login:
             if self.login():
@@ -351,64 +580,43 @@ class BoxMagicScraper:
         
         logger.info("Browser started successfully")
     
+    def _block_requests(self):
+        """
+        Abort images, fonts, video and tracker requests for self.page.
+        Uses CDP's Network.setBlockedURLs so the filter runs inside Chromium;
+        falls back to context routes (a Python callback per match) if CDP is unavailable
+        """
+        try:
+            cdp = self.context.new_cdp_session(self.page)
+            cdp.send('Network.enable')
+            cdp.send('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.debug(f"CDP request blocking unavailable ({e}), using route handlers")
+            self.context.route(BLOCKED_RESOURCES, lambda route: route.abort())
+            self.context.route(BLOCKED_HOSTS, lambda route: route.abort())
+    
     def get_available_coaches(self) -> List[str]:
         """
-        Get list of available coaches from the dropdown
+        Get list of available coaches from the dropdown (cached for the session)
         """
+        if self._coaches_cache:
+            return self._coaches_cache
+        
         try:
-            logger.info(f"Navigating to calendar: {self.config.CALENDAR_URL}")
-            self.page.goto(self.config.CALENDAR_URL, wait_until='networkidle')
+            self._goto_calendar()
             
-            # Wait for page to load
-            self.page.wait_for_selector('.pace-done', timeout=self.config.TIMEOUT)
-            self.page.wait_for_timeout(2000)
+            # Wait for page to load (pace-done gates readiness, no need for networkidle)
+            self._wait_for_pace()
             
             # Take screenshot to see the initial state
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / 'coach_dropdown_initial.png'),
-                full_page=True
-            )
+            self._snap('coach_dropdown_initial.jpg')
             
             # Find the Profesor dropdown and extract all options
-            coaches = self.page.evaluate('''
-                () => {
-                    // Look for all select elements
-                    const selects = document.querySelectorAll('select');
-                    
-                    for (let select of selects) {
-                        // Get all option texts
-                        const options = Array.from(select.options);
-                        const optionTexts = options.map(opt => opt.text.trim());
-                        
-                        // Check if this looks like the coach/professor dropdown
-                        // It should have names or "Profesor" label
-                        if (optionTexts.some(text => 
-                            text.includes('Profesor') || 
-                           re.match(r"[A-Z][a-z]+\s+[A-Z][a-z]+", text)  // Matches "FirstName LastName"
-                        )) {
-                            // Return all non-empty options, excluding generic labels
-                            return options
-                                .map(opt => ({
-                                    value: opt.value,
-                                    text: opt.text.trim()
-                                }))
-                                .filter(opt => 
-                                    opt.text.length > 0 && 
-                                    opt.text !== 'Profesor' && 
-                                    opt.text !== 'Seleccionar' &&
-                                    opt.text !== 'Todos' &&
-                                    opt.value !== ''
-                                )
-                                .map(opt => opt.text);
-                        }
-                    }
-                    
-                    return [];
-                }
-            ''')
+            coaches = self._find_coach_select()
             
             if coaches and len(coaches) > 0:
                 logger.info(f"Found {len(coaches)} coaches: {coaches}")
+                self._coaches_cache = coaches
                 return coaches
             
             logger.warning("Could not find coach dropdown or no coaches available")
@@ -416,10 +624,130 @@ class BoxMagicScraper:
             
         except Exception as e:
             logger.error(f"Error getting coaches: {str(e)}")
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / 'coach_dropdown_error.png')
-            )
+            self._snap_error('coach_dropdown_error.jpg')
+            return []
+    
+    def _goto_calendar(self):
+        """
+        Navigate to CALENDAR_URL, re-logging in if the server redirected to the login page
+        (saved auth cookies can outlive the server session)
+        """
+        logger.info(f"Navigating to calendar: {self.config.CALENDAR_URL}")
+        self.page.goto(self.config.CALENDAR_URL, wait_until='commit')
+        self._filtered_coach = None
+        if 'login' in self.page.url.lower():
+            logger.warning("Redirected to login page. Session might be invalid. Attempting re-login...")
+            if not self.login():
+                raise Exception("Failed to login after redirect")
+            logger.info("✓ Re-login successful. Navigating back to calendar...")
+            self.page.goto(self.config.CALENDAR_URL, wait_until='commit')
+            self._filtered_coach = None
+    
+    def _snap(self, name: str, clip: Optional[Dict] = None):
+        """
+        Progress screenshot, only taken when DEBUG_SCREENSHOTS is enabled.
+        Viewport-only JPEG; failures are captured with _snap_error
+        """
+        if not self.config.DEBUG_SCREENSHOTS:
+            return
+        image = self.page.screenshot(type='jpeg', quality=70, clip=clip)
+        # Capture stays on the page's thread; the file write happens in the background
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='snap')
+        self._io_pool.submit(_write_bytes, self._screenshots_prefix + name, image)
+    
+    def _snap_error(self, name: str):
+        """Error screenshot (always taken): viewport-only JPEG, never raises so it can't mask the original error"""
+        try:
+            self.page.screenshot(path=self._screenshots_prefix + name, type='jpeg', quality=60)
+        except Exception as e:
+            logger.debug(f"Could not take error screenshot {name}: {e}")
+    
+    def _any_locator(self, selectors: tuple):
+        """
+        First element matching any of the selectors, as one locator (a single query instead of one per selector).
+        Locators are lazy and survive navigation, so each selector tuple is built once per page.
+        """
+        locator = self._locators.get(selectors)
+        if locator is None:
+            locator = self.page.locator(selectors[0])
+            for selector in selectors[1:]:
+                locator = locator.or_(self.page.locator(selector))
+            locator = self._locators[selectors] = locator.first
+        return locator
+    
+    def _find_coach_select(self) -> List[str]:
+        """
+        Locate the coach dropdown on the current page, cache its handle and return its coach names
+        """
+        found_json = self.page.evaluate('(known) => window.__boxmagic.getCoaches(known)', self._coach_select_selector)
+        if found_json is None:
+            self._coach_select_handle = None
             return []
+        
+        found = orjson.loads(found_json)
+        if found['selector']:
+            self._coach_select_selector = found['selector']
+        self._coach_select_handle = self.page.query_selector(COACH_SELECT)
+        return found['names']
+    
+    def _wait_for_pace(self, timeout: Optional[int] = None):
+        """Wait until pace.js reports that the page and its AJAX requests finished loading"""
+        self.page.wait_for_function(PACE_READY_JS, timeout=timeout or self.config.TIMEOUT)
+    
+    def _wait_for_calendar_ready(self, timeout: Optional[int] = None):
+        """Wait until pace.js is done and calendar events are rendered, in a single in-browser predicate"""
+        self.page.wait_for_function(CALENDAR_READY_JS, timeout=timeout or self.config.TIMEOUT)
+    
+    def _on_calendar_page(self) -> bool:
+        """True if the page already shows the loaded calendar (query string and fragment ignored)"""
+        return (_url_path(self.page.url) == _url_path(self.config.CALENDAR_URL)
+                and self.page.query_selector('.pace-done') is not None)
+    
+    def _reset_coach_filter(self):
+        """Clear the coach dropdown and re-apply the filter so all coaches' events show"""
+        handle = self._coach_select_handle
+        if handle is None:
+            self._find_coach_select()
+            handle = self._coach_select_handle
+        if handle is not None:
+            handle.select_option(value='', timeout=2000)
+            self._apply_filter()
+        self._filtered_coach = None
+    
+    def _on_frame_navigated(self, frame):
+        # The cached dropdown/button handles belong to the previous document
+        if frame == self.page.main_frame:
+            self._coach_select_handle = None
+            self._filter_btn_handle = None
+    
+    def _select_coach_by_match(self, coach_name: str) -> bool:
+        """
+        Fallback coach selection: pick the dropdown option whose label fuzzy-matches the coach name,
+        through Playwright's native select_option (fires input/change like a real selection)
+        """
+        names = self._coaches_cache or self._find_coach_select()
+        label = next(
+            (name for name in names if name == coach_name),
+            next((name for name in names if coach_name in name or name in coach_name), None)
+        )
+        if label is None:
+            logger.error(f"Could not find coach in dropdown: {coach_name}")
+            self._snap_error(f'coach_not_found_{coach_name.replace(" ", "_")}.jpg')
+            return False
+        
+        logger.info(f"Selecting dropdown option '{label}' for coach '{coach_name}'")
+        try:
+            self.page.select_option(self._coach_select_selector or COACH_SELECT, label=label, timeout=2000)
+        except Exception as e:
+            logger.debug(f"Known coach dropdown selector failed: {e}")
+            try:
+                self._any_locator(COACH_DROPDOWN_SELECTORS).select_option(label=label, timeout=2000)
+            except Exception as e:
+                logger.error(f"Failed to select coach in dropdown: {e}")
+                self._snap_error('dropdown_not_opened.jpg')
+                return False
+        return True
     
     def select_coach(self, coach_name: str) -> bool:
         """
@@ -427,362 +755,198 @@ class BoxMagicScraper:
         """
         try:
             logger.info(f"Selecting coach: {coach_name}")
+            coach_tag = coach_name.replace(" ", "_")
             
-            # Step 1: Find and click the Profesor dropdown to open it
-            logger.info("Step 1: Opening Profesor dropdown...")
-            dropdown_opened = False
-            
-            # Try multiple ways to find and open the dropdown
-            dropdown_selectors = [
-                'select:has-text("Profesor")',
-                'select[name*="profesor"]',
-                'select[name*="coach"]',
-            ]
-            
-            for selector in dropdown_selectors:
+            # Select on the cached dropdown handle; select_option fires input/change natively
+            selected = False
+            if self._coach_select_handle is None:
+                self._find_coach_select()
+            if self._coach_select_handle is not None:
                 try:
-                    if self.page.locator(selector).count() > 0:
-                        # Click to open dropdown
-                        self.page.click(selector)
-                        self.page.wait_for_timeout(500)
-                        dropdown_opened = True
-                        logger.info(f"✓ Dropdown opened with selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not dropdown_opened:
-                # Try JavaScript approach - find any select with Profesor options
-                dropdown_opened = self.page.evaluate('''
-                    () => {
-                        const selects = document.querySelectorAll('select');
-                        for (let select of selects) {
-                            const options = Array.from(select.options);
-                            if (options.some(opt => opt.text.includes('Profesor'))) {
-                                select.focus();
-                                select.click();
-                                return true;
-                            }
-                        }
-                        return false;
-                    }
-                ''')
-                if dropdown_opened:
-                    self.page.wait_for_timeout(500)
-                    logger.info("✓ Dropdown opened via JavaScript")
-            
-            if not dropdown_opened:
-                logger.error("Failed to open dropdown")
-                self.page.screenshot(
-                    path=str(self.config.SCREENSHOTS_DIR / 'dropdown_not_opened.png')
-                )
-                return False
-            
-            # Step 2: Select the coach from dropdown
-            logger.info(f"Step 2: Selecting coach '{coach_name}' from dropdown...")
-            selected = self.page.evaluate('''
-                (coachName) => {
-                    const selects = document.querySelectorAll('select');
-                    
-                    for (let select of selects) {
-                        const options = Array.from(select.options);
-                        
-                        // Look for coach dropdown (has "Profesor" or coach names)
-                        const hasCoachOptions = options.some(opt => 
-                            opt.text.includes('Profesor') || 
-                            /[A-Z][a-z]+\\s+[A-Z][a-z]+/.test(opt.text)
-                        );
-                        
-                        if (hasCoachOptions) {
-                            // Find matching option
-                            const matchingOption = options.find(opt => 
-                                opt.text.trim() === coachName ||
-                                opt.text.trim().includes(coachName) ||
-                                coachName.includes(opt.text.trim())
-                            );
-                            
-                            if (matchingOption) {
-                                select.value = matchingOption.value;
-                                
-                                // Trigger change events
-                                select.dispatchEvent(new Event('change', { bubbles: true }));
-                                select.dispatchEvent(new Event('input', { bubbles: true }));
-                                
-                                if (window.jQuery) {
-                                    window.jQuery(select).trigger('change');
-                                }
-                                
-                                return true;
-                            }
-                        }
-                    }
-                    return false;
-                }
-            ''', coach_name)
+                    self._coach_select_handle.select_option(label=coach_name, timeout=2000)
+                    selected = True
+                except Exception as e:
+                    logger.debug(f"select_option failed for '{coach_name}', trying a fuzzy label match: {e}")
             
-            if not selected:
-                logger.error(f"Could not find coach in dropdown: {coach_name}")
-                self.page.screenshot(
-                    path=str(self.config.SCREENSHOTS_DIR / f'coach_not_found_{coach_name.replace(" ", "_")}.png')
-                )
+            if not selected and not self._select_coach_by_match(coach_name):
                 return False
             
             logger.info(f"✓ Coach '{coach_name}' selected in dropdown")
-            self.page.wait_for_timeout(500)
             
             # Take screenshot after selection
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / f'after_coach_selection_{coach_name.replace(" ", "_")}.png')
-            )
+            self._snap(f'after_coach_selection_{coach_tag}.jpg')
             
-            # Step 3: Click the "Filtrar" button
-            logger.info("Step 3: Clicking 'Filtrar' button...")
-            filter_clicked = False
-            
-            # Try multiple selectors for the filter button
-            filter_selectors = [
-                'button:has-text("Filtrar")',
-                'button:has-text("Filter")',
-                'input[type="submit"]:has-text("Filtrar")',
-                'a:has-text("Filtrar")',
-                '.btn:has-text("Filtrar")',
-                '[value="Filtrar"]'
-            ]
-            
-            for selector in filter_selectors:
-                try:
-                    if self.page.locator(selector).count() > 0:
-                        self.page.click(selector)
-                        filter_clicked = True
-                        logger.info(f"✓ Filter button clicked with selector: {selector}")
-                        break
-                except Exception as e:
-                    logger.debug(f"Selector {selector} failed: {e}")
-                    continue
-            
-            if not filter_clicked:
-                # Try to find any button near the dropdown that might be the filter
-                filter_clicked = self.page.evaluate('''
-                    () => {
-                        const buttons = document.querySelectorAll('button, input[type="submit"], a.btn');
-                        for (let btn of buttons) {
-                            const text = btn.textContent.trim().toLowerCase();
-                            if (text.includes('filtrar') || text.includes('filter') || text.includes('aplicar')) {
-                                btn.click();
-                                return true;
-                            }
-                        }
-                        return false;
-                    }
-                ''')
-                if filter_clicked:
-                    logger.info("✓ Filter button clicked via JavaScript")
-            
-            if not filter_clicked:
-                logger.warning("Could not find 'Filtrar' button - calendar might auto-filter")
-                # Some calendars auto-filter without a button
-            
-            # Step 4: Wait for calendar to reload with filtered data
-            logger.info("Step 4: Waiting for calendar to reload...")
-            try:
-                # Wait for loading indicator
-                self.page.wait_for_selector('.pace-running, .pace-active', timeout=2000)
-            except:
-                pass  # Loading might be instant
-            
-            # Wait for loading to complete
-            self.page.wait_for_selector('.pace-done', timeout=self.config.TIMEOUT)
-            self.page.wait_for_timeout(2000)
-            
-            # Wait for calendar events to appear
-            try:
-                self.page.wait_for_selector('.fc-time-grid-event', timeout=self.config.TIMEOUT)
-            except:
-                logger.warning("No events found after filtering - coach might have no classes")
-            
-            self.page.wait_for_timeout(1000)
+            self._apply_filter()
             
             # Take screenshot after filtering
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / f'after_filter_{coach_name.replace(" ", "_")}.png')
-            )
+            self._snap(f'after_filter_{coach_tag}.jpg')
             
+            self._filtered_coach = coach_name
             logger.info(f"✓ Successfully filtered calendar for coach: {coach_name}")
             return True
                 
         except Exception as e:
             logger.error(f"Error selecting coach: {str(e)}")
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / f'select_coach_error_{coach_name.replace(" ", "_")}.png'),
-                full_page=True
-            )
+            self._snap_error(f'select_coach_error_{coach_name.replace(" ", "_")}.jpg')
             return False
     
-    def scrape_calendar_with_details(self, coach_name: Optional[str] = None) -> Dict:
+    def _apply_filter(self):
+        """
+        Click "Filtrar" and wait for the calendar to reload with the current dropdown selection
+        """
+        # Step 3: Click the "Filtrar" button
+        logger.info("Step 3: Clicking 'Filtrar' button...")
+        filter_clicked = False
+        
+        # Same button for every coach on this page: reuse the handle found by the first filter
+        if self._filter_btn_handle is not None:
+            try:
+                if self._filter_btn_handle.is_visible():
+                    self._filter_btn_handle.click(timeout=2000)
+                    filter_clicked = True
+                    logger.info("✓ Filter button clicked")
+            except Exception as e:
+                logger.debug(f"Cached filter button failed: {e}")
+                self._filter_btn_handle = None
+        
+        if not filter_clicked:
+            try:
+                filter_button = self._any_locator(FILTER_BUTTON_SELECTORS)
+                filter_button.click(timeout=2000)
+                filter_clicked = True
+                logger.info("✓ Filter button clicked")
+                self._filter_btn_handle = filter_button.element_handle(timeout=1000)
+            except Exception as e:
+                logger.debug(f"Filter selectors failed: {e}")
+        
+        if not filter_clicked:
+            # Try to find any button near the dropdown that might be the filter
+            filter_clicked = self.page.evaluate('''
+                () => {
+                    const buttons = document.querySelectorAll('button, input[type="submit"], a.btn');
+                    for (let btn of buttons) {
+                        const text = btn.textContent.trim().toLowerCase();
+                        if (text.includes('filtrar') || text.includes('filter') || text.includes('aplicar')) {
+                            btn.click();
+                            return true;
+                        }
+                    }
+                    return false;
+                }
+            ''')
+            if filter_clicked:
+                logger.info("✓ Filter button clicked via JavaScript")
+        
+        if not filter_clicked:
+            logger.warning("Could not find 'Filtrar' button - calendar might auto-filter")
+            # Some calendars auto-filter without a button
+        
+        # Step 4: Wait for calendar to reload with filtered data
+        logger.info("Step 4: Waiting for calendar to reload...")
+        try:
+            # Wait for loading indicator
+            self.page.wait_for_selector('.pace-running, .pace-active', timeout=2000)
+        except TimeoutError:
+            pass  # Loading might be instant
+        
+        # Wait for loading to complete and calendar events to appear
+        try:
+            self._wait_for_calendar_ready()
+        except TimeoutError:
+            logger.warning("No events found after filtering - coach might have no classes")
+    
+    def scrape_calendar_with_details(self, coach_name: Optional[str] = None, reuse_page: bool = False) -> Dict:
         """
         Scrape calendar data including modal details for each event
         Optionally filter by coach name
+        reuse_page: skip reloading when the page already shows the calendar; only for back-to-back calls
+                    within one run (scrape_all_coaches), standalone calls always load a fresh calendar
         """
         if not self.is_logged_in:
             logger.error("Not logged in. Please login first.")
             return {}
         
+        # Screenshot file name part, computed once rather than per event
+        coach_tag = coach_name.replace(" ", "_") if coach_name else "all"
+        
         try:
-            logger.info(f"Navigating to calendar: {self.config.CALENDAR_URL}")
-            
-            # Navigate to calendar page
-            self.page.goto(self.config.CALENDAR_URL, wait_until='networkidle')
-            
-            # Wait for calendar to load
-            logger.info("Waiting for calendar to load...")
-            self.page.wait_for_selector('.pace-done', timeout=self.config.TIMEOUT)
-            self.page.wait_for_timeout(3000)
+            if reuse_page and self._on_calendar_page():
+                # Page just loaded by a previous call in this run; only the coach filter needs changing
+                logger.info("Calendar already loaded, reusing page")
+                if not coach_name and self._filtered_coach:
+                    self._reset_coach_filter()
+            else:
+                # Navigate to calendar page
+                self._goto_calendar()
+                
+                # Wait for calendar to load (pace-done gates readiness, no need for networkidle)
+                logger.info("Waiting for calendar to load...")
+                self._wait_for_calendar_ready()
             
-            # If coach specified, select them
-            if coach_name:
+            # If coach specified, select them (unless the page is already filtered to them)
+            if coach_name and coach_name != self._filtered_coach:
                 if not self.select_coach(coach_name):
                     logger.error(f"Failed to select coach: {coach_name}")
                     return {}
             
             # Take screenshot
-            screenshot_name = f'calendar_loaded_{coach_name.replace(" ", "_") if coach_name else "all"}.png'
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / screenshot_name),
-                full_page=True
-            )
+            self._snap(f'calendar_loaded_{coach_tag}.jpg')
             
-            # Get all event elements
+            # Get all event elements (a single round trip when the calendar is already ready)
             event_selectors = '.fc-time-grid-event.fc-v-event.fc-event'
-            self.page.wait_for_selector(event_selectors, timeout=self.config.TIMEOUT)
-            
-            # Get basic event data
-            events_data = self.page.evaluate('''
-                () => {
-                    const events = [];
-                    const eventElements = document.querySelectorAll('.fc-time-grid-event.fc-v-event.fc-event');
-                    
-                    eventElements.forEach((element, index) => {
-                        const text = element.textContent.trim();
-                        const style = element.getAttribute('style') || '';
-                        
-                        const timeMatch = text.match(/(\\d{1,2}:\\d{2})\\s*-\\s*(\\d{1,2}:\\d{2})/);
-                        
-                        events.push({
-                            index: index,
-                            text: text,
-                            startTime: timeMatch ? timeMatch[1] : null,
-                            endTime: timeMatch ? timeMatch[2] : null,
-                            style: style,
-                            hasTime: timeMatch !== null
-                        });
-                    });
-                    
-                    return events;
-                }
-            ''')
+            self._wait_for_calendar_ready()
             
-            # Filter events with valid time
-            valid_events = [e for e in events_data if e['hasTime']]
+            # Get basic event data: raw [text, styleIndex] rows plus the distinct styles, parsed here
+            styles, event_rows = orjson.loads(self.page.evaluate('window.__boxmagic.readEvents()'))
+            valid_events = self._parse_event_rows(event_rows, styles)
             logger.info(f"Found {len(valid_events)} events to process")
             
             # Now click each event to get details
             detailed_events = []
-            event_elements = self.page.query_selector_all(event_selectors)
+            # Locators re-resolve on every action, so FullCalendar re-renders can't leave stale handles
+            events_loc = self.page.locator(event_selectors)
+            event_count = events_loc.count()
+            # Set after the modal is told to close; the close animation runs while the next event is located
+            modal_closing = False
             
             for idx, event_data in enumerate(valid_events):
                 try:
                     logger.info(f"Processing event {idx + 1}/{len(valid_events)}: {event_data['startTime']} - {event_data['endTime']}")
                     
-                    # Find the corresponding element
-                    if idx < len(event_elements):
-                        element = event_elements[idx]
+                    # Find the corresponding element (by its DOM index, not its position among valid events)
+                    if event_data['index'] < event_count:
+                        # click() scrolls the element into view itself
+                        element = events_loc.nth(event_data['index'])
                         
-                        # Scroll element into view
-                        element.scroll_into_view_if_needed()
-                        self.page.wait_for_timeout(500)
+                        # Previous modal must be gone before the next click
+                        if modal_closing:
+                            self._finish_closing_modal()
+                            modal_closing = False
                         
                         # Click the event to open modal
                         element.click()
                         
-                        # Wait for modal to appear
-                        self.page.wait_for_selector('.modal-content, [role="dialog"], .modal', timeout=5000)
-                        self.page.wait_for_timeout(1000)
-                        
-                        # Extract modal details
-                        modal_details = self.page.evaluate('''
-                            () => {
-                                const modal = document.querySelector('.modal-content, [role="dialog"], .modal');
-                                if (!modal) return null;
-                                
-                                const getCleanValue = (labelText) => {
-                                    const allElements = Array.from(modal.querySelectorAll('*'));
-                                    
-                                    for (let el of allElements) {
-                                        const text = el.textContent.trim();
-                                        
-                                        if (text.startsWith(labelText)) {
-                                            const value = text.replace(labelText, '').trim();
-                                            const cleanValue = value.split(/\\n|\\s{2,}/)[0].trim();
-                                            return cleanValue || null;
-                                        }
-                                    }
-                                    return null;
-                                };
-                                
-                                const getTeachers = () => {
-                                    const text = modal.textContent;
-                                    const match = text.match(/Profesores asignados:\\s*([^Select]+?)(?=Select|Sala|$)/);
-                                    if (match) {
-                                        const names = match[1].match(/[A-Z][a-z]+\\s+[A-Z][a-z]+/g) || [];
-                                        return [...new Set(names)].join(', ');
-                                    }
-                                    return null;
-                                };
-                                
-                                return {
-                                    day: getCleanValue('Día:'),
-                                    className: getCleanValue('Clase:'),
-                                    program: getCleanValue('Programa'),
-                                    startTime: getCleanValue('Hora Inicio:'),
-                                    endTime: getCleanValue('Hora Fin:'),
-                                    capacity: getCleanValue('Cupos de clientes por clase:'),
-                                    trialClass: getCleanValue('Clase de prueba:'),
-                                    onlineClass: getCleanValue('Clase Online'),
-                                    freeClass: getCleanValue('Clase libre'),
-                                    teachers: getTeachers()
-                                };
-                            }
-                        ''')
-                        
-                        # Take screenshot of modal
-                        modal_screenshot = f'modal_{coach_name.replace(" ", "_") if coach_name else "all"}_event_{idx}.png'
-                        self.page.screenshot(
-                            path=str(self.config.SCREENSHOTS_DIR / modal_screenshot)
-                        )
-                        
-                        # Close modal
-                        close_selectors = [
-                            'button:has-text("Cerrar")',
-                            'button:has-text("Close")',
-                            '.modal-close',
-                            '[aria-label="Close"]',
-                            'button.close'
-                        ]
-                        
-                        modal_closed = False
-                        for selector in close_selectors:
-                            try:
-                                if self.page.locator(selector).count() > 0:
-                                    self.page.click(selector)
-                                    modal_closed = True
-                                    break
-                            except:
-                                continue
+                        # Wait for the modal body to be populated and read it in the same predicate
+                        try:
+                            modal_details = self.page.wait_for_function(
+                                MODAL_READY_DETAILS_JS, timeout=5000
+                            ).json_value()
+                        except Exception:
+                            # Modal without the usual labels: read whatever it shows (fails if no modal opened)
+                            self.page.wait_for_selector('.modal-content, [role="dialog"], .modal', timeout=1000)
+                            modal_details = self.page.evaluate('window.__boxmagic.readModal()')
                         
-                        if not modal_closed:
-                            self.page.keyboard.press('Escape')
+                        # Take screenshot of modal (clipped to the modal itself)
+                        if self.config.DEBUG_SCREENSHOTS:
+                            modal_box = self.page.locator('.modal-content, [role="dialog"], .modal').first.bounding_box()
+                            self._snap(
+                                f'modal_{coach_tag}_event_{idx}.jpg',
+                                clip=modal_box
+                            )
                         
-                        self.page.wait_for_timeout(1000)
+                        # Start closing the modal; the wait happens just before the next click
+                        self._start_closing_modal()
+                        modal_closing = True
                         
                         # Combine data and add coach info
                         combined_event = {
@@ -798,11 +962,15 @@ class BoxMagicScraper:
                     logger.error(f"Error processing event {idx}: {str(e)}")
                     try:
                         self.page.keyboard.press('Escape')
-                        self.page.wait_for_timeout(500)
-                    except:
+                        self.page.wait_for_selector('.modal-content, [role="dialog"], .modal', state='hidden', timeout=2000)
+                    except Exception:
                         pass
+                    modal_closing = False
                     continue
             
+            if modal_closing:
+                self._finish_closing_modal()
+            
             logger.info(f"Successfully extracted details for {len(detailed_events)} events")
             
             return {
@@ -816,42 +984,214 @@ class BoxMagicScraper:
             
         except Exception as e:
             logger.error(f"Failed to scrape calendar: {str(e)}")
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / 'scraping_error.png')
-            )
+            self._snap_error('scraping_error.jpg')
             return {}
     
-    def scrape_all_coaches(self) -> Dict:
+    def _start_closing_modal(self):
+        """Send Escape to the open modal, or click its close button if Escape already proved not to work"""
+        if self._modal_close_by_click and self.page.evaluate('window.__boxmagic.closeModal()'):
+            return
+        self.page.keyboard.press('Escape')
+    
+    def _finish_closing_modal(self):
         """
-        Scrape calendar data for all available coaches
+        Wait for a modal already told to close to hide; Escape works for the modal library,
+        the close buttons are only a fallback (remembered once they were needed)
         """
+        modal_selector = '.modal-content, [role="dialog"], .modal'
+        try:
+            self.page.wait_for_selector(modal_selector, state='hidden', timeout=1500)
+        except Exception:
+            try:
+                # One evaluate finds and clicks the close control instead of probing selectors from Python
+                if self.page.evaluate('window.__boxmagic.closeModal()'):
+                    self.page.wait_for_selector(modal_selector, state='hidden', timeout=2000)
+                    self._modal_close_by_click = True
+            except Exception:
+                pass
+    
+    @staticmethod
+    def _parse_event_rows(event_rows: List[List], styles: List[str]) -> List[Dict]:
+        """
+        Timed events from readEvents() [text, styleIndex] rows; 'index' is the event's position on the grid
+        (used to click it later), events without a time range are dropped
+        """
+        valid_events = []
+        search = EVENT_TIME_RE.search
+        for index, (text, style_index) in enumerate(event_rows):
+            time_match = search(text)
+            if time_match:
+                valid_events.append({
+                    'index': index,
+                    'text': text,
+                    'startTime': time_match[1],
+                    'endTime': time_match[2],
+                    'style': styles[style_index],
+                    'hasTime': True
+                })
+        return valid_events
+    
+    @staticmethod
+    def _group_events_by_coach(coaches: List[str], calendar_data: Dict) -> Dict[str, Dict]:
+        """
+        Split an unfiltered calendar scrape into per-coach results (same shape as
+        scrape_calendar_with_details(coach_name=...)), using each event's teachers field.
+        Coaches with no events in the unfiltered view are left out.
+        """
+        events_by_coach = {}
+        for event in calendar_data.get('events', []):
+            teachers = (event.get('modalDetails') or {}).get('teachers') or ''
+            # readModal() joins names with ", "; compare whole names so "Ana" doesn't match "Ana María"
+            names = {name.strip() for name in teachers.split(',')}
+            for coach in coaches:
+                if coach.strip() in names:
+                    events_by_coach.setdefault(coach, []).append({**event, 'filteredCoach': coach})
+        
+        return {
+            coach: {
+                **calendar_data,
+                'coach': coach,
+                'events': events,
+                'totalEvents': len(events)
+            }
+            for coach, events in events_by_coach.items()
+        }
+    
+    def _scrape_coaches_in_worker(self, coach_queue: queue.Queue, storage_state: Dict) -> Dict[str, Dict]:
+        """
+        Pull coaches off the shared queue until it is empty, scraping them with one separate
+        browser sharing this scraper's session.
+        Runs on a worker thread: sync Playwright objects can't be shared across threads,
+        so each worker starts its own browser and reuses its page for every coach it takes.
+        """
+        results = {}
+        worker = BoxMagicScraper(self.config, headless=self.headless)
+        try:
+            worker.start_browser(storage_state=storage_state)
+            while True:
+                try:
+                    coach = coach_queue.get_nowait()
+                except queue.Empty:
+                    break
+                logger.info(f"\n{'='*60}")
+                logger.info(f"Processing coach: {coach}")
+                logger.info(f"{'='*60}\n")
+                try:
+                    # The worker's page only ever shows calendars loaded during this run
+                    results[coach] = worker.scrape_calendar_with_details(coach_name=coach, reuse_page=True)
+                except Exception as e:
+                    logger.error(f"Coach worker failed for {coach}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Coach worker failed to start: {str(e)}")
+        finally:
+            try:
+                # The parent scraper owns session.json; workers only borrow its state
+                worker.close(save_session=False)
+            except Exception as e:
+                logger.debug(f"Error closing coach worker browser: {e}")
+        return results
+    
+    def scrape_all_coaches(self, workers: Optional[int] = None, stream_to_file: bool = False) -> Dict:
+        """
+        Scrape calendar data for all available coaches: one unfiltered pass first, then
+        per-coach filtering only for coaches missing from it, pulled from a shared queue by
+        `workers` browsers (default COACH_WORKERS, at most MAX_COACH_WORKERS).
+        Returns {scrapedAt, totalCoaches, coaches: {coach: coach_data}}.
+        
+        stream_to_file: append each coach's events to a calendar_events_<timestamp>.jsonl file in DATA_DIR
+        as soon as they are scraped instead of holding them in memory; the result then also has
+        'eventsFile', and 'coaches' maps each coach to its event count. Only the newest
+        EVENTS_FILE_RETENTION such files are kept.
+        """
+        # get_available_coaches only loads the calendar when the coach list isn't cached yet
+        calendar_fresh = not self._coaches_cache
         coaches = self.get_available_coaches()
         
         if not coaches:
             logger.error("No coaches found")
             return {}
         
+        now = datetime.now()
         all_data = {
-            'scrapedAt': datetime.now().isoformat(),
+            'scrapedAt': now.isoformat(),
             'totalCoaches': len(coaches),
             'coaches': {}
         }
         
-        for coach in coaches:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Processing coach: {coach}")
-            logger.info(f"{'='*60}\n")
-            
-            coach_data = self.scrape_calendar_with_details(coach_name=coach)
-            
-            if coach_data:
-                all_data['coaches'][coach] = coach_data
+        if stream_to_file:
+            events_file = self.config.DATA_DIR / f'calendar_events_{now.strftime("%Y%m%d_%H%M%S")}.jsonl'
+            all_data['eventsFile'] = str(events_file)
+            out = open(events_file, 'ab')
+        else:
+            out = None
+        
+        try:
+            def record(coach, coach_data):
+                if out is not None:
+                    # One line per coach, flushed so a crash mid-run keeps every finished coach
+                    out.write(orjson.dumps({'coach': coach, **coach_data}) + b'\n')
+                    out.flush()
+                    all_data['coaches'][coach] = coach_data.get('totalEvents', 0)
+                else:
+                    all_data['coaches'][coach] = coach_data
                 logger.info(f"✓ Completed scraping for {coach}: {coach_data.get('totalEvents', 0)} events")
-            else:
+            
+            # One unfiltered pass over the calendar (reusing the page get_available_coaches just loaded)
+            # covers every coach whose events show up in the "all" view
+            logger.info("Scraping unfiltered calendar for all coaches in one pass...")
+            grouped = self._group_events_by_coach(
+                coaches, self.scrape_calendar_with_details(coach_name=None, reuse_page=calendar_fresh)
+            )
+            logger.info(f"Unfiltered pass covered {len(grouped)}/{len(coaches)} coaches")
+            for coach, coach_data in grouped.items():
+                record(coach, coach_data)
+            missing = [coach for coach in coaches if coach not in grouped]
+            del grouped
+            
+            if missing:
+                # Session handed to the workers in memory, so none of them re-reads session.json
+                storage_state = self.context.storage_state()
+                if workers is None:
+                    workers = self.config.COACH_WORKERS
+                workers = max(1, min(workers, MAX_COACH_WORKERS, len(missing)))
+                # Workers take the next coach when they finish one, so a slow coach doesn't hold up a fixed slice
+                coach_queue = queue.Queue()
+                for coach in missing:
+                    coach_queue.put(coach)
+                
+                # Results are consumed (and recorded) on this thread only, so the file needs no lock
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='coach') as pool:
+                    futures = [pool.submit(self._scrape_coaches_in_worker, coach_queue, storage_state) for _ in range(workers)]
+                    for future in as_completed(futures):
+                        for coach, coach_data in future.result().items():
+                            if coach_data:
+                                record(coach, coach_data)
+        finally:
+            if out is not None:
+                out.close()
+                self._prune_events_files()
+        
+        for coach in coaches:
+            if coach not in all_data['coaches']:
                 logger.error(f"✗ Failed to scrape data for {coach}")
         
+        # Persist cookies refreshed during the run, so a later crash doesn't lose them
+        try:
+            self.refresh_session()
+        except Exception as e:
+            logger.warning(f"Could not save session: {e}")
+        
         return all_data
     
+    def _prune_events_files(self):
+        """Delete all but the newest EVENTS_FILE_RETENTION calendar_events_*.jsonl files in DATA_DIR"""
+        events_files = sorted(self.config.DATA_DIR.glob('calendar_events_*.jsonl'))
+        for old_file in events_files[:-EVENTS_FILE_RETENTION]:
+            try:
+                old_file.unlink()
+            except OSError as e:
+                logger.warning(f"Could not delete old events file {old_file}: {e}")
+    
     # Find and replace this method in src/scraper_playwright.py
 
     def select_date_on_checkin(self, date_str: str) -> bool:
@@ -861,53 +1201,60 @@ class BoxMagicScraper:
         
         try:
             # Wait for the date input to be available
-            self.page.wait_for_selector(date_selector, timeout=10000)
+            self.page.wait_for_selector(date_selector, timeout=self.config.CLASS_LOAD_TIMEOUT_MS)
             
             logger.info(f"Found date input with selector: {date_selector}")
             
-            # Set the date value using JavaScript
-            success = self.page.evaluate('''
-                (args) => {
-                    const dateValue = args.dateValue;
-                    const selector = args.selector;
-                    const input = document.querySelector(selector);
-                    if (!input) return false;
+            # Set the date value using JavaScript; the change fires the page's classes XHR,
+            # whose response replaces the old fixed wait for the dropdown to populate
+            success = False
+            try:
+                with self.page.expect_response(_is_classes_response, timeout=self.config.CLASS_LOAD_TIMEOUT_MS):
+                    success = self.page.evaluate('''
+                    (args) => {
+                        const dateValue = args.dateValue;
+                        const selector = args.selector;
+                        const input = document.querySelector(selector);
+                        if (!input) return false;
                     
-                    // Set the value
-                    input.value = dateValue;
+                        // Set the value
+                        input.value = dateValue;
                     
-                    // Trigger multiple events to ensure it's picked up
-                    input.dispatchEvent(new Event('input', { bubbles: true }));
-                    input.dispatchEvent(new Event('change', { bubbles: true }));
-                    input.dispatchEvent(new Event('blur', { bubbles: true }));
+                        // Trigger multiple events to ensure it's picked up
+                        input.dispatchEvent(new Event('input', { bubbles: true }));
+                        input.dispatchEvent(new Event('change', { bubbles: true }));
+                        input.dispatchEvent(new Event('blur', { bubbles: true }));
                     
-                    // If jQuery is available, trigger change event
-                    if (window.jQuery) {
-                        window.jQuery(input).val(dateValue).trigger('change');
-                    }
+                        // If jQuery is available, trigger change event
+                        if (window.jQuery) {
+                            window.jQuery(input).val(dateValue).trigger('change');
+                        }
                     
-                    // If there's a datepicker, try to update it
-                    if (window.jQuery && window.jQuery(input).data('datepicker')) {
-                        window.jQuery(input).datepicker('update', dateValue);
-                        window.jQuery(input).datepicker('setDate', dateValue);
-                    }
+                        // If there's a datepicker, try to update it
+                        if (window.jQuery && window.jQuery(input).data('datepicker')) {
+                            window.jQuery(input).datepicker('update', dateValue);
+                            window.jQuery(input).datepicker('setDate', dateValue);
+                        }
                     
-                    return true;
-                }
-            ''', {'dateValue': date_str, 'selector': date_selector})
+                        return true;
+                    }
+                ''', {'dateValue': date_str, 'selector': date_selector})
+            except Exception as e:
+                logger.debug(f"No classes response after setting the date: {e}")
             
             if not success:
                 logger.error("Failed to set date value via JavaScript")
                 return False
             
-            # Wait longer for the date change to process and classes to load
+            # The response is in; give the page a moment to render it into #clases
             logger.info("Waiting for classes dropdown to populate...")
-            self.page.wait_for_timeout(3000)
+            try:
+                self.page.wait_for_function(CLASS_OPTIONS_READY_JS, timeout=self.config.CLASS_OPTIONS_WAIT_MS)
+            except Exception:
+                pass  # No classes that day, or the dropdown is rendered differently
             
             # Take screenshot after date selection
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / f'after_date_select_{date_str.replace("-", "_")}.png')
-            )
+            self._snap(f'after_date_select_{date_str.replace("-", "_")}.jpg')
             
             logger.info(f"✓ Date selected: {date_str}")
             return True
@@ -921,7 +1268,26 @@ class BoxMagicScraper:
         Parse API response into list of {value, text, index} dicts.
         BoxMagic date_get_clases returns clase_id and dias_clases_id separately.
         The get_alumnos_clase endpoint requires value = clase_id-dias_clases_id (e.g. 104996-237092).
+        Results are cached per payload (retries and intercepted XHRs re-parse the same body); callers get copies.
         """
+        if not data:
+            return []
+        try:
+            key = data if isinstance(data, str) else orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except Exception:
+            key = None
+        cached = self._classes_parse_cache.get(key) if key is not None else None
+        if cached is None:
+            cached = self._parse_classes_payload(data)
+            if key is not None:
+                if len(self._classes_parse_cache) >= CLASSES_PARSE_CACHE_SIZE:
+                    self._classes_parse_cache.clear()
+                self._classes_parse_cache[key] = cached
+        return [dict(c) for c in cached]
+    
+    @staticmethod
+    def _parse_classes_payload(data) -> List[Dict]:
+        """Uncached body of _parse_classes_from_api_response"""
         classes = []
         
         def parse_item(item, i):
@@ -963,40 +1329,37 @@ class BoxMagicScraper:
                         classes.append({'value': str(k), 'text': v.strip(), 'index': len(classes)})
         elif isinstance(data, str) and '<option' in data:
             # Parse HTML option elements
-            for m in re.finditer(r'<option\s+value=["\']([^"\']+)["\'][^>]*>([^<]*)</option>', data, re.I):
+            for m in OPTION_RE.finditer(data):
                 val, txt = m.group(1).strip(), m.group(2).strip()
-                if val and not any(skip in txt for skip in ('Selecciona', 'Seleccionar', 'Select')):
+                if val and not any(skip in txt for skip in OPTION_PLACEHOLDERS):
                     classes.append({'value': val, 'text': txt, 'index': len(classes)})
         return classes
     
     def get_classes_for_date_api_only(self, date_str: str) -> List[Dict]:
         """
         Get classes for a date by calling the API directly - NO DOM interaction.
-        Uses page.request.get with browser session. Works even if #class_date is not visible.
+        Uses the browser session's cookies (see _api_get_json). Works even if #class_date is not visible.
         Returns list of dicts: [{'value': clase_id-dias_clases_id, 'text': class_name, 'index': i}, ...]
         """
-        base_url = "https://boxmagic.cl"
-        endpoints_to_try = [
-            f"/checkin/date_get_clases/{date_str}",
-            f"/checkin/get_clases?fecha_where={date_str}",
-            f"/checkin/clases_select?fecha_where={date_str}",
-        ]
-        headers = {'X-Requested-With': 'XMLHttpRequest', 'Accept': 'application/json, text/javascript, */*; q=0.01'}
-        for path in endpoints_to_try:
+        # The endpoint that answered for an earlier date (or was seen in the page's own XHR) goes first
+        templates = [t for t in CLASSES_ENDPOINTS if t != self._classes_endpoint]
+        if self._classes_endpoint:
+            templates.insert(0, self._classes_endpoint)
+        for template in templates:
+            url = template.replace('{date}', date_str)
             try:
-                url = base_url + path
                 logger.info(f"Fetching classes via API: {url}")
-                response = self.page.request.get(url, headers=headers, timeout=15000)
-                if response.status != 200:
-                    logger.debug(f"API returned {response.status} for {path}")
+                status, body = self._api_get_json(url, timeout=15)
+                if status != 200:
+                    logger.debug(f"API returned {status} for {url}")
                     continue
-                body = response.json()
                 parsed = self._parse_classes_from_api_response(body)
                 if parsed:
+                    self._classes_endpoint = template
                     logger.info(f"✓ Found {len(parsed)} classes via API (no DOM)")
                     return parsed
             except Exception as e:
-                logger.debug(f"API {path} failed: {e}")
+                logger.debug(f"API {url} failed: {e}")
         return []
     
     def get_classes_for_date_via_api(self, date_str: str) -> List[Dict]:
@@ -1028,13 +1391,16 @@ class BoxMagicScraper:
                     parsed = self._parse_classes_from_api_response(body)
                     if parsed:
                         captured_classes.extend(parsed)
+                        # Remember the page's own classes XHR so later dates call it directly
+                        if date_str in url:
+                            self._classes_endpoint = url.replace(date_str, '{date}')
             except Exception:
                 pass
         
         try:
             self.page.on('response', handle_response)
+            # Returns once the classes response arrived, so the handler has already seen it
             self.select_date_on_checkin(date_str)
-            self.page.wait_for_timeout(4000)
         except Exception as e:
             logger.debug(f"DOM date selection failed: {e}")
         finally:
@@ -1064,16 +1430,19 @@ class BoxMagicScraper:
         """
         class_selector = '#clases'
         # Flexible regex: match clase_id-dias_clases_id (digits-digits) in value
-        value_pattern = re.compile(r'(\d+-\d+)')
-        max_retries = 3
+        value_pattern = CLASS_VALUE_RE
+        max_retries = self.config.CLASS_LOAD_RETRIES
         for attempt in range(max_retries):
             try:
-                self.page.wait_for_selector(class_selector, timeout=10000)
+                self.page.wait_for_selector(class_selector, timeout=self.config.CLASS_LOAD_TIMEOUT_MS)
                 try:
                     self.page.wait_for_selector('#select_clases_loading, .bm-loader', state='hidden', timeout=5000)
                 except Exception:
                     pass
-                self.page.wait_for_timeout(1500 * (attempt + 1))
+                try:
+                    self.page.wait_for_function(CLASS_OPTIONS_READY_JS, timeout=self.config.CLASS_OPTIONS_WAIT_MS * (attempt + 1))
+                except Exception:
+                    pass  # Read whatever options are there
                 raw_options = self.page.evaluate('''
                     (selector) => {
                         const select = document.querySelector(selector);
@@ -1108,8 +1477,6 @@ class BoxMagicScraper:
                     return unique
             except Exception as e:
                 logger.warning(f"DOM fallback attempt {attempt + 1}/{max_retries} failed: {e}")
-                if attempt < max_retries - 1:
-                    self.page.wait_for_timeout(2000)
         logger.error("DOM fallback exhausted all retries")
         return []
     
@@ -1145,7 +1512,7 @@ class BoxMagicScraper:
             class_name = (class_info.get('text') or class_info.get('nombre') or 'Unknown').strip() if isinstance(class_info, dict) else 'Unknown'
             
             # Validate class_id: must match format clase_id-dias_clases_id (e.g. "104996-237092")
-            if not class_id or not re.search(r'^\d+-\d+$', class_id):
+            if not class_id or not CLASS_ID_RE.match(class_id):
                 logger.error(f"Invalid class_id '{class_id}' for class '{class_name}' - skipping")
                 return {}
             
@@ -1155,40 +1522,36 @@ class BoxMagicScraper:
             def call_api(url):
                 logger.info(f"Fetching data from API: {url}")
                 try:
-                    # Use page context to make the API call (to include cookies/auth)
-                    # Adding headers just in case, though page.request should handle cookies
-                    response = self.page.request.get(url, headers={
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'Accept': 'application/json, text/javascript, */*; q=0.01'
-                    })
-                    
-                    logger.info(f"API Response Status: {response.status}")
-                    if response.status != 200:
-                        return None
-                    
-                    response_text = response.text()
-                    logger.debug(f"API Response Body: {response_text[:500]}...")
-                    return response.json()
+                    # Sends the browser session's cookies/auth
+                    status, body = self._api_get_json(url)
+                    logger.info(f"API Response Status: {status}")
+                    return body
                 except Exception as e:
                     logger.error(f"API request failed: {e}")
                     return None
 
-            # 1. Try with original date format (DD-MM-YYYY)
-            api_url = f"https://boxmagic.cl/checkin/get_alumnos_clase/{class_id}?fecha_where={date_str}&method=alumnos"
-            data = call_api(api_url)
+            def alumnos_url(fecha):
+                return f"https://boxmagic.cl/checkin/get_alumnos_clase/{class_id}?fecha_where={fecha}&method=alumnos"
+            
+            # 1. Try the date format the endpoint accepted last (original DD-MM-YYYY until ISO is seen to work)
+            iso_first = self._alumnos_iso_dates
+            try:
+                data = call_api(alumnos_url(_to_iso_date(date_str) if iso_first else date_str))
+            except Exception as e:
+                logger.warning(f"Date conversion failed: {e}")
+                iso_first, data = False, call_api(alumnos_url(date_str))
             
-            # 2. Only retry with YYYY-MM-DD format when API actually failed (not for empty clases)
+            # 2. Only retry with the other format when API actually failed (not for empty clases)
             # Empty alumnos is valid (class with 0 reservations); only retry on success=false or no response
             if not data or not data.get('success', False):
                 try:
-                    date_obj = datetime.strptime(date_str, "%d-%m-%Y")
-                    date_iso = date_obj.strftime("%Y-%m-%d")
-                    logger.info(f"Retrying with ISO date format: {date_iso}")
-                    api_url_iso = f"https://boxmagic.cl/checkin/get_alumnos_clase/{class_id}?fecha_where={date_iso}&method=alumnos"
-                    data_iso = call_api(api_url_iso)
-                    if data_iso and data_iso.get('success', False):
-                        logger.info("✓ ISO date format returned data")
-                        data = data_iso
+                    other = date_str if iso_first else _to_iso_date(date_str)
+                    logger.info(f"Retrying with date format: {other}")
+                    data_other = call_api(alumnos_url(other))
+                    if data_other and data_other.get('success', False):
+                        logger.info(f"✓ Date format {other} returned data, using it first from now on")
+                        data = data_other
+                        self._alumnos_iso_dates = not iso_first
                 except Exception as e:
                     logger.warning(f"Date conversion failed: {e}")
 
@@ -1210,16 +1573,15 @@ class BoxMagicScraper:
             alumnos = data.get('alumnos') or []
             logger.info(f"✓ Retrieved {len(alumnos)} reservations from API for class: {class_name}")
             
-            # Format the reservations data
-            formatted_reservations = []
-            for alumno in alumnos:
-                formatted_reservations.append({
+            # Format the reservations data (name parts stripped once per row)
+            formatted_reservations = [
+                {
                     'id': alumno.get('id'),
                     'reserva_id': alumno.get('reserva_id'),
                     'hash_reserva_id': alumno.get('hash_reserva_id'),
-                    'name': alumno.get('name', '').strip(),
-                    'last_name': alumno.get('last_name', '').strip(),
-                    'full_name': f"{alumno.get('name', '').strip()} {alumno.get('last_name', '').strip()}".strip(),
+                    'name': (name := (alumno.get('name') or '').strip()),
+                    'last_name': (last_name := (alumno.get('last_name') or '').strip()),
+                    'full_name': f"{name} {last_name}".strip(),
                     'email': alumno.get('email'),
                     'telefono': alumno.get('telefono'),
                     'status': alumno.get('status'),
@@ -1233,7 +1595,9 @@ class BoxMagicScraper:
                     'rating': alumno.get('rating'),
                     'imagen': alumno.get('imagen'),
                     'fila': alumno.get('fila'),
-                })
+                }
+                for alumno in alumnos
+            ]
             
             return {
                 'class': class_name,
@@ -1250,12 +1614,15 @@ class BoxMagicScraper:
             logger.error(f"Error extracting reservations for class {class_info.get('text', 'unknown')}: {str(e)}", exc_info=True)
             return {}
     
-    def scrape_checkin_for_date(self, date_str: str, navigate: bool = True, on_class_scraped=None) -> Dict:
+    def scrape_checkin_for_date(self, date_str: str, navigate: bool = True, on_class_scraped=None, classes: Optional[List[Dict]] = None,
+                                reservations: Optional[List[Dict]] = None) -> Dict:
         """
         Scrape check-in data for a specific date
         date_str: Date string in format "DD-MM-YYYY"
         navigate: If True, navigates to check-in page first. If False, assumes already on check-in page.
         on_class_scraped: Optional callback function(date_str, class_data) called after each class is scraped
+        classes: Optional class list already fetched for this date (skips the class lookup when non-empty)
+        reservations: Optional per-class results already fetched for `classes`, in the same order
         """
         try:
             logger.info(f"\n{'='*60}")
@@ -1265,54 +1632,69 @@ class BoxMagicScraper:
             # Navigate to check-in page only if requested
             if navigate:
                 logger.info(f"Navigating to check-in page: {self.config.CHECKIN_URL}")
-                self.page.goto(self.config.CHECKIN_URL, wait_until='networkidle')
+                self.page.goto(self.config.CHECKIN_URL, wait_until='domcontentloaded')
                 
-                # Wait for page to load
-                self.page.wait_for_selector('.pace-done', timeout=self.config.TIMEOUT)
-                self.page.wait_for_timeout(2000)
+                # Wait for page to load (the DOM fallback below waits for #class_date itself)
+                self._wait_for_pace()
             
             # Wait for date input
             logger.info(f"Fetching classes for date: {date_str}")
             
             # API-first: no DOM required. Works when #class_date times out (e.g. slow Render, login redirect)
-            classes = self.get_classes_for_date_via_api(date_str)
+            if not classes:
+                classes = self.get_classes_for_date_via_api(date_str)
             
             # DOM fallback: only if API returned empty
             if not classes:
                 if 'checkin' not in self.page.url.lower() and navigate:
-                    self.page.goto(self.config.CHECKIN_URL, wait_until='networkidle')
+                    self.page.goto(self.config.CHECKIN_URL, wait_until='domcontentloaded')
                 try:
-                    self.page.wait_for_selector('#class_date', state='visible', timeout=10000)
+                    self.page.wait_for_selector('#class_date', state='visible', timeout=self.config.CLASS_LOAD_TIMEOUT_MS)
                     classes = self.get_classes_for_date_via_api(date_str)
                 except Exception as e:
                     logger.warning(f"DOM fallback skipped: {e}")
             
+            scraped_at = datetime.now().isoformat()
             if not classes:
                 logger.warning(f"No classes found for date: {date_str}")
                 return {
                     'date': date_str,
                     'classes': {},
                     'totalClasses': 0,
-                    'scrapedAt': datetime.now().isoformat()
+                    'totalReservations': 0,
+                    'scrapedAt': scraped_at
                 }
             
             date_data = {
                 'date': date_str,
                 'classes': {},
                 'totalClasses': len(classes),
-                'scrapedAt': datetime.now().isoformat()
+                'totalReservations': 0,
+                'scrapedAt': scraped_at
             }
             
+            # Reservations are plain HTTP calls when the API session is open: fetch them concurrently
+            prefetched = reservations if reservations is not None and len(reservations) == len(classes) else None
+            if prefetched is None and self._http is not None:
+                with ThreadPoolExecutor(max_workers=self.config.CHECKIN_WORKERS) as pool:
+                    prefetched = list(pool.map(
+                        lambda c: self.select_class_and_extract_reservations(c, date_str), classes
+                    ))
+            
             # Process each class
             for idx, class_info in enumerate(classes):
                 logger.info(f"\nProcessing class {idx + 1}/{len(classes)}: {class_info['text']}")
                 
-                class_data = self.select_class_and_extract_reservations(class_info, date_str)
+                if prefetched is not None:
+                    class_data = prefetched[idx]
+                else:
+                    class_data = self.select_class_and_extract_reservations(class_info, date_str)
                 
                 if class_data:
                     # Use class_id as key for uniqueness (same name can exist for different classes)
                     key = class_data.get('classId') or class_info.get('value') or class_info['text']
                     date_data['classes'][key] = class_data
+                    date_data['totalReservations'] += class_data.get('totalReservations', 0)
                     logger.info(f"✓ Completed: {class_data.get('totalReservations', 0)} reservations")
                     
                     # Call per-class callback if provided
@@ -1324,28 +1706,27 @@ class BoxMagicScraper:
                 else:
                     logger.error(f"✗ Failed to extract data for class: {class_info['text']}")
                 
-                # Small delay between classes
-                self.page.wait_for_timeout(1000)
+                # Small delay between classes fetched one by one through the page
+                if prefetched is None:
+                    self.page.wait_for_timeout(self.config.CHECKIN_PACING_MS)
             
             logger.info(f"\n✓ Completed scraping for date {date_str}: {len(date_data['classes'])} classes")
             return date_data
             
         except Exception as e:
             logger.error(f"Error scraping check-in for date {date_str}: {str(e)}")
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / f'checkin_error_{date_str.replace("-", "_")}.png')
-            )
+            self._snap_error(f'checkin_error_{date_str.replace("-", "_")}.jpg')
             return {}
     
-    def scrape_checkin_all_dates(self, start_date: datetime = None, days_count: int = 7, on_progress=None, existing_data: Dict = None) -> Dict:
+    def iter_checkin_dates(self, start_date: datetime = None, days_count: int = 7, on_class_scraped=None):
         """
-        Scrape check-in data for a range of dates
+        Scrape check-in data date by date, yielding (date_str, date_data) as soon as each date
+        is done ({} for a date that failed), so callers can save or process it before the next one.
         start_date: Starting date (default: today)
         days_count: Number of days to scrape (default: 7)
-        on_progress: Optional callback function(data) called after each date is scraped
-        existing_data: Optional dict containing previously scraped data to merge with
-        Navigates to CHECKIN_URL once at the beginning and stays on that page
-        Uses API endpoint to fetch reservation data directly
+        on_class_scraped: Optional callback function(date_str, class_data) called after each class is scraped
+        Classes and reservations come from the JSON API; CHECKIN_URL is only loaded (once) for dates that
+        need the page fallback, or when the API returns nothing at all
         """
         if start_date is None:
             # Use configured timezone for "today"
@@ -1359,54 +1740,137 @@ class BoxMagicScraper:
             logger.info(f"Starting check-in scraping for {days_count} days: {start_date.strftime('%d-%m-%Y')} to {end_date.strftime('%d-%m-%Y')}")
             logger.info(f"{'='*80}\n")
             
-            # Navigate to check-in page once at the beginning
-            logger.info(f"Navigating to check-in page: {self.config.CHECKIN_URL}")
-            try:
-                self.page.goto(self.config.CHECKIN_URL, wait_until='networkidle', timeout=60000)
-                logger.info(f"✓ Successfully navigated to {self.config.CHECKIN_URL}")
-            except Exception as e:
-                logger.error(f"Failed to navigate to check-in page: {str(e)}")
-                self.page.screenshot(path=str(self.config.SCREENSHOTS_DIR / 'navigation_error.png'))
-                raise
+            # Check-in data comes from the JSON API over the browser session's cookies; the check-in page
+            # itself is only loaded when a date has to fall back to it
+            self._open_api_session()
+            date_strs = [(start_date + timedelta(days=i)).strftime('%d-%m-%Y') for i in range(days_count)]
+            prefetched_classes = self._prefetch_classes(date_strs) if self._http is not None else {}
+            page_ready = False
+            if not any(prefetched_classes.values()):
+                # Nothing from the API (e.g. expired session): load the page, re-logging in if redirected, and retry
+                self._open_checkin_page()
+                page_ready = True
+                self._open_api_session()
+                prefetched_classes = self._prefetch_classes(date_strs) if self._http is not None else {}
+            # ...then every date's reservations in one sweep, so a slow date doesn't hold up the next one
+            prefetched_reservations = self._prefetch_reservations(prefetched_classes) if self._http is not None else {}
+            
+            # Process each date (without navigating again), reusing the date strings built for the prefetch
+            for i, date_str in enumerate(date_strs):
+                
+                logger.info(f"\n{'#'*80}")
+                logger.info(f"Processing date: {date_str} (Day {i + 1}/{days_count})")
+                logger.info(f"{'#'*80}\n")
+                
+                try:
+                    # Dates without API classes fall back to the page; load it the first time that happens
+                    if not prefetched_classes.get(date_str) and not page_ready:
+                        self._open_checkin_page()
+                        page_ready = True
+                    # Don't navigate again, we're already on the check-in page (when it's needed at all)
+                    date_data = self.scrape_checkin_for_date(
+                        date_str, 
+                        navigate=False,
+                        on_class_scraped=on_class_scraped,
+                        classes=prefetched_classes.get(date_str),
+                        reservations=prefetched_reservations.get(date_str)
+                    )
+                except Exception as e:
+                    logger.warning(f"Error processing date {date_str} on first attempt: {str(e)}")
+                    logger.info("Attempting retry with full navigation/refresh...")
+                    
+                    try:
+                        # Second attempt: force navigation to refresh state
+                        date_data = self.scrape_checkin_for_date(
+                            date_str, 
+                            navigate=True,
+                            on_class_scraped=on_class_scraped
+                        )
+                        logger.info(f"✓ Retry successful for date {date_str}")
+                    except Exception as retry_e:
+                        logger.error(f"Error processing date {date_str} on retry: {str(retry_e)}", exc_info=True)
+                        self._snap_error(f'error_date_{date_str.replace("-", "_")}.jpg')
+                        date_data = {}
+                
+                yield date_str, date_data
+                
+                # Delay between dates scraped through the page (prefetched dates made no new requests)
+                if date_str not in prefetched_reservations:
+                    self.page.wait_for_timeout(self.config.CHECKIN_PACING_MS)
             
-            # Verify we're on the correct page
-            current_url = self.page.url
-            logger.info(f"Current URL: {current_url}")
-            
-            # Check if we were redirected to login
-            if 'login' in current_url.lower():
-                logger.warning("Redirected to login page. Session might be invalid. Attempting re-login...")
-                if self.login():
-                    logger.info("✓ Re-login successful. Navigating back to check-in...")
-                    self.page.goto(self.config.CHECKIN_URL, wait_until='networkidle', timeout=60000)
-                else:
-                    raise Exception("Failed to login after redirect")
+        finally:
+            self._close_api_session()
+    
+    def _open_checkin_page(self):
+        """Load CHECKIN_URL (re-logging in if redirected to login) and wait until the date picker is usable"""
+        # Navigate to the check-in page
+        logger.info(f"Navigating to check-in page: {self.config.CHECKIN_URL}")
+        try:
+            self.page.goto(self.config.CHECKIN_URL, wait_until='domcontentloaded', timeout=60000)
+            logger.info(f"✓ Successfully navigated to {self.config.CHECKIN_URL}")
+        except Exception as e:
+            logger.error(f"Failed to navigate to check-in page: {str(e)}")
+            self._snap_error('navigation_error.jpg')
+            raise
+        
+        # Verify we're on the correct page
+        current_url = self.page.url
+        logger.info(f"Current URL: {current_url}")
+        
+        # Check if we were redirected to login
+        if 'login' in current_url.lower():
+            logger.warning("Redirected to login page. Session might be invalid. Attempting re-login...")
+            if self.login():
+                logger.info("✓ Re-login successful. Navigating back to check-in...")
+                self.page.goto(self.config.CHECKIN_URL, wait_until='domcontentloaded', timeout=60000)
+            else:
+                raise Exception("Failed to login after redirect")
 
-            if 'checkin' not in self.page.url.lower():
-                logger.warning(f"Warning: Current URL doesn't contain 'checkin'. Expected: {self.config.CHECKIN_URL}")
-            
-            # Wait for page to load - try multiple selectors
-            logger.info("Waiting for page to load...")
-            try:
-                # Increased timeout for Render
-                self.page.wait_for_selector('.pace-done', timeout=30000)
-                logger.info("✓ Page loaded (pace-done found)")
-            except:
-                logger.warning("pace-done selector not found, trying alternative wait...")
-                self.page.wait_for_load_state('networkidle', timeout=30000)
-                logger.info("✓ Page loaded (networkidle)")
-            
-            self.page.wait_for_timeout(5000)  # Increased extra wait for dynamic content
-            
-            # Take screenshot to verify we're on the right page
-            self.page.screenshot(
-                path=str(self.config.SCREENSHOTS_DIR / 'checkin_page_loaded.png'),
-                full_page=True
-            )
-            logger.info("✓ Screenshot saved: checkin_page_loaded.png")
+        if 'checkin' not in self.page.url.lower():
+            logger.warning(f"Warning: Current URL doesn't contain 'checkin'. Expected: {self.config.CHECKIN_URL}")
+        
+        # Wait for page to load - try multiple selectors
+        logger.info("Waiting for page to load...")
+        picker_timeout = 5000
+        try:
+            # Increased timeout for Render
+            self._wait_for_pace(timeout=30000)
+            logger.info("✓ Page loaded (pace-done found)")
+        except TimeoutError:
+            # No pace-done: the date picker alone is the readiness signal, so give it the full timeout
+            logger.warning("pace-done selector not found, waiting for the date picker instead...")
+            picker_timeout = self.config.TIMEOUT
+        
+        # Date picker rendered means the check-in UI is usable (classes themselves come from the API)
+        try:
+            self.page.wait_for_selector('#class_date', state='visible', timeout=picker_timeout)
+        except Exception:
+            logger.warning("Date picker not visible yet, continuing with the API")
+        
+        # Take screenshot to verify we're on the right page
+        self._snap('checkin_page_loaded.jpg')
+    
+    def scrape_checkin_all_dates(self, start_date: datetime = None, days_count: int = 7, on_progress=None, existing_data: Dict = None) -> Dict:
+        """
+        Scrape check-in data for a range of dates (see iter_checkin_dates) into one merged dict
+        start_date: Starting date (default: today)
+        days_count: Number of days to scrape (default: 7)
+        on_progress: Optional callback function(data) called after each date is scraped
+        existing_data: Optional dict containing previously scraped data to merge with
+        Uses API endpoint to fetch reservation data directly
+        """
+        if start_date is None:
+            # Use configured timezone for "today"
+            tz = ZoneInfo(self.config.TIMEZONE)
+            start_date = datetime.now(tz)
             
+        end_date = start_date + timedelta(days=days_count - 1)
+        
+        try:
+            # One timestamp for this run, shared by the summary and the per-date entries created below
+            scraped_at = datetime.now().isoformat()
             all_data = {
-                'scrapedAt': datetime.now().isoformat(),
+                'scrapedAt': scraped_at,
                 'dateRange': {
                     'startDay': start_date.day,
                     'endDay': end_date.day,
@@ -1424,75 +1888,54 @@ class BoxMagicScraper:
                 logger.info(f"Initializing with existing data for {len(existing_data['dates'])} dates")
                 all_data['dates'] = existing_data['dates'].copy()
             
-            # Process each date (without navigating again)
-            for i in range(days_count):
-                current_date = start_date + timedelta(days=i)
-                date_str = current_date.strftime('%d-%m-%Y')
-                
-                logger.info(f"\n{'#'*80}")
-                logger.info(f"Processing date: {date_str} (Day {i + 1}/{days_count})")
-                logger.info(f"{'#'*80}\n")
-                
+            # Summary totals kept up to date by adding/removing one date's contribution at a time,
+            # so progress updates don't re-sum every date
+            totals = {'totalClasses': 0, 'totalReservations': 0}
+            
+            def count_date(day, sign):
+                totals['totalClasses'] += sign * day.get('totalClasses', 0)
+                totals['totalReservations'] += sign * self._date_total_reservations(day)
+            
+            def update_summary():
+                all_data['summary'] = {'totalDates': len(all_data['dates']), **totals}
+            
+            for day in all_data['dates'].values():
+                count_date(day, 1)
+            
+            def date_entry(d_str):
                 # Initialize date entry in all_data if not exists
-                if date_str not in all_data['dates']:
-                    all_data['dates'][date_str] = {
-                        'date': date_str,
+                if d_str not in all_data['dates']:
+                    all_data['dates'][d_str] = {
+                        'date': d_str,
                         'classes': {},
                         'totalClasses': 0,
-                        'scrapedAt': datetime.now().isoformat()
+                        'totalReservations': 0,
+                        'scrapedAt': scraped_at
                     }
+            
+            # Define per-class callback to update main data structure
+            def on_class_scraped_handler(d_str, c_data):
+                date_entry(d_str)
+                day = all_data['dates'][d_str]
+                count_date(day, -1)
+                # Update class data (use classId as key for uniqueness)
+                key = c_data.get('classId') or c_data.get('class')
+                day['classes'][key] = c_data
                 
-                # Define per-class callback to update main data structure
-                def on_class_scraped_handler(d_str, c_data):
-                    if d_str in all_data['dates']:
-                        # Update class data (use classId as key for uniqueness)
-                        key = c_data.get('classId') or c_data.get('class')
-                        all_data['dates'][d_str]['classes'][key] = c_data
-                        
-                        # Update totals
-                        all_data['dates'][d_str]['totalClasses'] = len(all_data['dates'][d_str]['classes'])
-                        
-                        # Update summary
-                        all_data['summary'] = {
-                            'totalDates': len(all_data['dates']),
-                            'totalClasses': sum(d.get('totalClasses', 0) for d in all_data['dates'].values()),
-                            'totalReservations': sum(
-                                sum(c.get('totalReservations', 0) for c in d.get('classes', {}).values())
-                                for d in all_data['dates'].values()
-                            )
-                        }
-                        
-                        # Trigger main progress callback
-                        if on_progress:
-                            on_progress(all_data)
-
-                try:
-                    # Don't navigate again, we're already on the check-in page
-                    # First attempt: assume we are on the page
-                    date_data = self.scrape_checkin_for_date(
-                        date_str, 
-                        navigate=False,
-                        on_class_scraped=on_class_scraped_handler
-                    )
-                except Exception as e:
-                    logger.warning(f"Error processing date {date_str} on first attempt: {str(e)}")
-                    logger.info("Attempting retry with full navigation/refresh...")
-                    
-                    try:
-                        # Second attempt: force navigation to refresh state
-                        date_data = self.scrape_checkin_for_date(
-                            date_str, 
-                            navigate=True,
-                            on_class_scraped=on_class_scraped_handler
-                        )
-                        logger.info(f"✓ Retry successful for date {date_str}")
-                    except Exception as retry_e:
-                        logger.error(f"Error processing date {date_str} on retry: {str(retry_e)}", exc_info=True)
-                        self.page.screenshot(
-                            path=str(self.config.SCREENSHOTS_DIR / f'error_date_{date_str.replace("-", "_")}.png')
-                        )
-                        date_data = {}
+                # Update totals
+                day['totalClasses'] = len(day['classes'])
+                day['totalReservations'] = sum(c.get('totalReservations', 0) for c in day['classes'].values())
+                count_date(day, 1)
+                
+                # Update summary
+                update_summary()
                 
+                # Trigger main progress callback
+                if on_progress:
+                    on_progress(all_data)
+            
+            for date_str, date_data in self.iter_checkin_dates(start_date, days_count, on_class_scraped=on_class_scraped_handler):
+                date_entry(date_str)
                 if date_data:
                     # Merge with existing data for this date if it exists
                     if date_str in all_data['dates']:
@@ -1533,24 +1976,20 @@ class BoxMagicScraper:
                         
                         logger.info(f"Merged data for {date_str}: {len(existing_classes)} existing + {len(new_classes)} new -> {len(merged_classes)} total classes")
                     
-                    all_data['dates'][date_str] = date_data
-                    
                     total_classes = date_data.get('totalClasses', 0)
                     total_reservations = sum(
                         class_data.get('totalReservations', 0)
                         for class_data in date_data.get('classes', {}).values()
                     )
+                    date_data['totalReservations'] = total_reservations
+                    count_date(all_data['dates'][date_str], -1)
+                    all_data['dates'][date_str] = date_data
+                    count_date(date_data, 1)
+                    
                     logger.info(f"✓ Date {date_str}: {total_classes} classes, {total_reservations} total reservations")
                     
                     # Update summary for incremental saving (final update for date)
-                    all_data['summary'] = {
-                        'totalDates': len(all_data['dates']),
-                        'totalClasses': sum(d.get('totalClasses', 0) for d in all_data['dates'].values()),
-                        'totalReservations': sum(
-                            sum(c.get('totalReservations', 0) for c in d.get('classes', {}).values())
-                            for d in all_data['dates'].values()
-                        )
-                    }
+                    update_summary()
                     
                     # Call progress callback if provided
                     if on_progress:
@@ -1562,26 +2001,11 @@ class BoxMagicScraper:
                 else:
                     logger.error(f"✗ Failed to scrape date: {date_str}")
                 
-                # Delay between dates
-                self.page.wait_for_timeout(1000)
-            
-            # Calculate totals
-            total_dates = len(all_data['dates'])
-            total_classes = sum(
-                date_data.get('totalClasses', 0)
-                for date_data in all_data['dates'].values()
-            )
-            total_reservations = sum(
-                sum(class_data.get('totalReservations', 0)
-                    for class_data in date_data.get('classes', {}).values())
-                for date_data in all_data['dates'].values()
-            )
-            
-            all_data['summary'] = {
-                'totalDates': total_dates,
-                'totalClasses': total_classes,
-                'totalReservations': total_reservations
-            }
+            # Totals were accumulated as dates came in
+            update_summary()
+            total_dates = all_data['summary']['totalDates']
+            total_classes = totals['totalClasses']
+            total_reservations = totals['totalReservations']
             
             logger.info(f"\n{'='*80}")
             logger.info("CHECK-IN SCRAPING SUMMARY")
@@ -1596,9 +2020,122 @@ class BoxMagicScraper:
         except Exception as e:
             logger.error(f"Error in scrape_checkin_all_dates: {str(e)}", exc_info=True)
             return {}
+        finally:
+            self._close_api_session()
     
-    def close(self):
-        """Close browser and cleanup"""
+    def _open_api_session(self):
+        """
+        Open a requests.Session carrying the browser context's cookies. Playwright's sync objects
+        only work on the thread that created them; this session can be shared by worker threads.
+        """
+        self._close_api_session()
+        try:
+            session = requests.Session()
+            session.headers.update({'User-Agent': USER_AGENT, **API_HEADERS})
+            session.mount('https://', HTTPAdapter(pool_maxsize=self.config.CHECKIN_WORKERS))
+            for cookie in self.context.cookies():
+                session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+                )
+            self._http = session
+        except Exception as e:
+            logger.warning(f"Could not open API session, using page requests: {e}")
+            self._http = None
+    
+    def _close_api_session(self):
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
+    def _api_get_json(self, url: str, timeout: int = 30):
+        """
+        GET a check-in API endpoint with the session's cookies. Returns (status, parsed JSON or None).
+        Uses the API session when open (thread-safe), otherwise the page's request context.
+        """
+        if self._http is not None:
+            # Keep-alive pool: connections (and TLS sessions) are reused across calls and worker threads
+            response = self._http.get(url, timeout=(API_CONNECT_TIMEOUT, timeout))
+            status = response.status_code
+        else:
+            response = self.page.request.get(url, headers=API_HEADERS, timeout=timeout * 1000)
+            status = response.status
+        
+        if status != 200:
+            return status, None
+        try:
+            return status, response.json()
+        except Exception:
+            logger.debug(f"Non-JSON response from {url}")
+            return status, None
+    
+    def _prefetch_classes(self, date_strs: List[str]) -> Dict[str, List[Dict]]:
+        """Fetch the class lists for several dates concurrently (API only, no DOM)"""
+        with ThreadPoolExecutor(max_workers=self.config.CHECKIN_WORKERS) as pool:
+            return dict(zip(date_strs, pool.map(self.get_classes_for_date_api_only, date_strs)))
+    
+    def _prefetch_reservations(self, classes_by_date: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Fetch the reservations of every (date, class) pair concurrently over the API session,
+        in one pool for all dates. Returns {date: [class_data, ...]} in each date's class order.
+        """
+        pairs = [(date_str, class_info) for date_str, classes in classes_by_date.items() for class_info in classes or ()]
+        by_date = {}
+        with ThreadPoolExecutor(max_workers=self.config.CHECKIN_WORKERS) as pool:
+            results = pool.map(lambda pair: self.select_class_and_extract_reservations(pair[1], pair[0]), pairs)
+            for (date_str, _), class_data in zip(pairs, results):
+                by_date.setdefault(date_str, []).append(class_data)
+        return by_date
+    
+    @staticmethod
+    def _date_total_reservations(date_data: Dict) -> int:
+        """Reservations for one date, using the stored per-date total when present"""
+        if 'totalReservations' in date_data:
+            return date_data['totalReservations']
+        # Dates saved before per-date totals existed
+        return sum(c.get('totalReservations', 0) for c in date_data.get('classes', {}).values())
+    
+    def is_alive(self) -> bool:
+        """Return True if the browser is still connected and the page is usable"""
+        try:
+            # Persistent contexts have no Browser object; their page closes if Chromium goes away
+            browser_ok = self.browser.is_connected() if self.browser else self.context is not None
+            return bool(browser_ok and self.page and not self.page.is_closed())
+        except Exception:
+            return False
+    
+    def refresh_session(self):
+        """
+        Write the context's current cookies/localStorage to SESSION_FILE (atomically),
+        so the next process starts with the latest session instead of logging in again
+        """
+        if not (self.is_logged_in and self.context):
+            return
+        
+        session_file = self.config.SESSION_FILE
+        save_storage_state(session_file, self.context.storage_state())
+        logger.info(f"✓ Session saved to {session_file}")
+    
+    def _save_session_at_exit(self):
+        # Best effort: Playwright may already be shutting down
+        try:
+            if self.context and self.page and not self.page.is_closed():
+                self.refresh_session()
+        except Exception:
+            pass
+    
+    def close(self, save_session=True):
+        """Close browser and cleanup (persisting the session first unless save_session is False)"""
+        atexit.unregister(self._save_session_at_exit)
+        if self._io_pool is not None:
+            # Let pending screenshot writes finish
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+        if save_session:
+            try:
+                self.refresh_session()
+            except Exception as e:
+                logger.warning(f"Could not save session on close: {e}")
         if self.page:
             self.page.close()
         if self.context:
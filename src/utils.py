@@ -1,26 +1,37 @@
 import logging
+import random
 import time
-from functools import wraps
+from functools import cache, wraps
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
-import os
+
+# Log file size before rotation, and rotated files kept
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 3
+
+@cache
 def setup_logging(log_file='logs/scraper.log'):
-    os.makedirs("logs", exist_ok=True)
-    """Configure logging for the application"""
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    """Configure logging for the application (once; later calls return the logger without opening more files)"""
+    if logging.getLogger().hasHandlers():
+        # basicConfig would ignore new handlers anyway; don't open a file that never gets used
+        return logging.getLogger(__name__)
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    # One formatter shared by both handlers; explicit datefmt skips the per-record msecs formatting
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', '%Y-%m-%d %H:%M:%S', validate=False)
+    # Rotate so long-running schedules don't grow one unbounded log file
+    handlers = [RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    logging.basicConfig(level=logging.INFO, handlers=handlers)
     return logging.getLogger(__name__)
 
-def retry(max_attempts=3, delay=1):
-    """Decorator to retry a function if it fails"""
+def retry(max_attempts=3, delay=1, max_delay=30, give_up_on=()):
+    """
+    Decorator to retry a function if it fails, with exponential backoff and jitter.
+    delay is the first wait (doubled per attempt, capped at max_delay). Exceptions in give_up_on, and HTTP errors
+    with a 4xx status other than 429 (e.response.status_code), are raised immediately; a Retry-After header is honored
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -28,32 +39,62 @@ def retry(max_attempts=3, delay=1):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == max_attempts - 1:
+                    response = getattr(e, 'response', None)
+                    status = getattr(response, 'status_code', None)
+                    if attempt == max_attempts - 1 or isinstance(e, give_up_on) or (
+                        status is not None and 400 <= status < 500 and status != 429
+                    ):
                         raise
-                    logging.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying...")
-                    time.sleep(delay)
+                    wait = min(max_delay, delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+                    try:
+                        wait = min(max_delay, float(response.headers['Retry-After']))
+                    except Exception:
+                        pass
+                    logging.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {wait:.1f}s...")
+                    time.sleep(wait)
             return None
         return wrapper
     return decorator
 
-def save_to_file(data, filename, format='json'):
-    """Save scraped data to file"""
-    import json
+def save_to_file(data, filename, format='json', fieldnames=None):
+    """
+    Save scraped data to file.
+    CSV rows (and JSON arrays given as a generator) are written one at a time, so data can be any iterable;
+    CSV columns come from fieldnames, or from the first row's keys
+    """
+    import orjson
     import csv
+    from itertools import chain
     from pathlib import Path
     
     filepath = Path(filename)
     filepath.parent.mkdir(parents=True, exist_ok=True)
     
     if format == 'json':
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # orjson writes UTF-8 bytes directly (same output as indent=2, ensure_ascii=False)
+        json_options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        with open(filepath, 'wb') as f:
+            if isinstance(data, (dict, list, tuple)) or data is None:
+                f.write(orjson.dumps(data, option=json_options))
+            else:
+                # Stream other iterables as a JSON array, one item at a time
+                f.write(b'[')
+                for i, item in enumerate(data):
+                    f.write(b',\n' if i else b'\n')
+                    f.write(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS))
+                f.write(b'\n]')
     elif format == 'csv':
-        if isinstance(data, list) and len(data) > 0:
-            keys = data[0].keys()
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=keys)
+        rows = iter(data or ())
+        if fieldnames is None:
+            first = next(rows, None)
+            if first is not None:
+                fieldnames = list(first.keys())
+                rows = chain((first,), rows)
+        if fieldnames:
+            # 1 MiB buffer batches the per-row writes
+            with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
-                writer.writerows(data)
+                writer.writerows(rows)
     
     logging.info(f"Data saved to {filepath}")
@@ -13,7 +13,7 @@ from zoneinfo import ZoneInfo
 # Add project root
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.scraper_playwright import BoxMagicScraper
+from src.scraper_playwright import BoxMagicScraper, auth_cookies_fresh
 
 
 # Sample BoxMagic date_get_clases API response
@@ -110,6 +110,14 @@ class TestParseClassesFromApiResponse:
         assert len(result) == 1
         assert result[0]["value"] == "104996-237092"
 
+    def test_repeat_parse_returns_independent_copies(self, scraper):
+        """Cached parses are equal but mutating one result must not leak into the next."""
+        first = scraper._parse_classes_from_api_response(SAMPLE_DATE_GET_CLASES)
+        first[0]["text"] = "changed"
+        second = scraper._parse_classes_from_api_response(SAMPLE_DATE_GET_CLASES)
+        assert second[0]["text"] == "Sesión grupal 6:00 am"
+        assert len(second) == 2
+
 
 class TestClassIdValidation:
     """Test class_id format is correct for API calls."""
@@ -408,3 +416,69 @@ class TestRegexValueExtraction:
         assert pattern.match("104996-237092")
         assert not pattern.match("abc-237092")
         assert not pattern.match("104996-abc")
+
+
+class TestAuthCookiesFresh:
+    """Saved-session shortcut: skip the verification navigation only for unexpired auth cookies."""
+
+    NOW = 1_800_000_000
+
+    def _state(self, *cookies):
+        return {"cookies": list(cookies), "origins": []}
+
+    def test_future_auth_cookie_is_fresh(self):
+        state = self._state({"name": "laravel_session", "domain": ".boxmagic.cl", "expires": self.NOW + 3600})
+        assert auth_cookies_fresh(state, now=self.NOW)
+
+    def test_expired_auth_cookie_is_not_fresh(self):
+        state = self._state(
+            {"name": "laravel_session", "domain": ".boxmagic.cl", "expires": self.NOW + 3600},
+            {"name": "remember_token", "domain": "boxmagic.cl", "expires": self.NOW - 10},
+        )
+        assert not auth_cookies_fresh(state, now=self.NOW)
+
+    def test_session_only_and_foreign_cookies_are_not_enough(self):
+        state = self._state(
+            {"name": "laravel_session", "domain": ".boxmagic.cl", "expires": -1},
+            {"name": "_ga_session", "domain": ".google.com", "expires": self.NOW + 3600},
+        )
+        assert not auth_cookies_fresh(state, now=self.NOW)
+        assert not auth_cookies_fresh(self._state(), now=self.NOW)
+
+
+class TestParseEventRows:
+    """Calendar events: time ranges are parsed in Python from readEvents() rows."""
+
+    def test_timed_events_keep_grid_index(self):
+        styles = ["top: 10px;", "", "top: 90px;"]
+        rows = [
+            ["06:00 - 07:00 Sesión grupal", 0],
+            ["Feriado", 1],
+            ["9:15-10:15 Semiprivada", 2],
+            ["06:00 - 07:00 Sesión grupal", 0],
+        ]
+        events = BoxMagicScraper._parse_event_rows(rows, styles)
+        assert [e["index"] for e in events] == [0, 2, 3]
+        assert (events[0]["startTime"], events[0]["endTime"]) == ("06:00", "07:00")
+        assert (events[1]["startTime"], events[1]["endTime"]) == ("9:15", "10:15")
+        assert events[1]["style"] == "top: 90px;"
+        assert events[2]["style"] == events[0]["style"] == "top: 10px;"
+        assert all(e["hasTime"] for e in events)
+
+
+class TestGroupEventsByCoach:
+    """The unfiltered calendar pass assigns events to coaches by exact teacher name."""
+
+    def test_partial_names_do_not_match(self):
+        calendar_data = {
+            "events": [
+                {"startTime": "06:00", "modalDetails": {"teachers": "Ana María, Juan Pablo"}},
+                {"startTime": "07:00", "modalDetails": {"teachers": "Ana Lopez"}},
+            ]
+        }
+        grouped = BoxMagicScraper._group_events_by_coach(
+            ["Ana Lopez", "Ana María", "Juan"], calendar_data
+        )
+        assert set(grouped) == {"Ana Lopez", "Ana María"}
+        assert [e["startTime"] for e in grouped["Ana María"]["events"]] == ["06:00"]
+        assert grouped["Ana Lopez"]["totalEvents"] == 1